@@ -1,6 +1,14 @@
 import os
 import json
+import marshal
+import hashlib
 import pkgutil
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import Utils
+from BaseClasses import ItemClassification
 
 def load_data_file(*args) -> dict:
     fname = "/".join(["data", *args])
@@ -12,15 +20,200 @@ def load_data_file(*args) -> dict:
 item_id_offset: int 	= 45000
 location_id_offset: int = 42000
 
-item_info = load_data_file("items.json")
-item_name_to_id = {name: item_id_offset + index \
-	for index, name in enumerate(item_info["all_items"])}
-item_name_to_id["Bee Trap"] = item_id_offset + 100  # historical reasons
+data_files = ("items.json", "locations.json", "excluded_locations.json", "regions.json", "rules.json")
+# Bump whenever build_data_tables changes what it returns
+data_cache_version = 2
+
+def build_data_tables(contents: Dict[str, bytes]) -> Tuple[dict, dict]:
+	"""
+	Parse the data files into the small index needed to import the world, and the full tables.
+	The index holds the datapackage ID maps and the structure connections Options needs to define its classes.
+	"""
+	item_info = json.loads(contents["items.json"].decode())
+	item_name_to_id = {name: item_id_offset + index \
+		for index, name in enumerate(item_info["all_items"])}
+	item_name_to_id["Bee Trap"] = item_id_offset + 100  # historical reasons
+
+	location_info = json.loads(contents["locations.json"].decode())
+	location_name_to_id = {name: location_id_offset + index \
+		for index, name in enumerate(location_info["all_locations"])}
+
+	region_info = json.loads(contents["regions.json"].decode())
+
+	index = {
+		"item_name_to_id": item_name_to_id,
+		"location_name_to_id": location_name_to_id,
+		"default_connections": region_info["default_connections"],
+		"illegal_connections": region_info["illegal_connections"],
+	}
+	tables = {
+		"item_info": item_info,
+		"location_info": location_info,
+		"exclusion_info": json.loads(contents["excluded_locations.json"].decode()),
+		"region_info": region_info,
+		"rule_info": json.loads(contents["rules.json"].decode()),
+	}
+	return index, tables
+
+@lru_cache(maxsize=None)
+def data_cache_key() -> str:
+	"""
+	Key stored at the start of the cache, built from the content of the data files, the marshal format
+	and data_cache_version, so the cache is rebuilt whenever any of them changes.
+	"""
+	digest = hashlib.sha1()
+	for name in data_files:
+		contents = pkgutil.get_data(__name__, "data/" + name)
+		digest.update(f"{name}:{len(contents)}:".encode())
+		digest.update(contents)
+	return f"{data_cache_version}-{marshal.version}-{digest.hexdigest()}"
+
+@lru_cache(maxsize=None)
+def data_cache_file() -> str:
+	"""
+	Path of the marshal cache in Archipelago's cache directory. It's named after where this module is installed,
+	so a new cache replaces the old one in place, and installs sharing the cache directory, like a development
+	checkout next to an installed .apworld, each keep their own.
+	"""
+	install = hashlib.sha1(os.path.abspath(__file__).encode()).hexdigest()[:16]
+	return os.path.join(Utils.cache_path("minecraft"), f"install-{install}.marshal")
+
+def parse_data_files() -> Tuple[dict, dict]:
+	"""Parse the data files and write the cache: its key, then the index so it loads on its own, then the tables."""
+	contents = {name: pkgutil.get_data(__name__, "data/" + name) for name in data_files}
+	index, tables = build_data_tables(contents)
+	cache_file = data_cache_file()
+	cache_dir = os.path.dirname(cache_file)
+	try:
+		os.makedirs(cache_dir, exist_ok=True)
+		temp_file = f"{cache_file}.{os.getpid()}.tmp"
+		with open(temp_file, "wb") as f:
+			marshal.dump(data_cache_key(), f)
+			marshal.dump(index, f)
+			marshal.dump(tables, f)
+		os.replace(temp_file, cache_file)
+		# Caches named after their content by earlier versions, which nothing reads anymore
+		for entry in os.scandir(cache_dir):
+			if entry.name.startswith("data-") and entry.name.endswith(".marshal"):
+				os.remove(entry.path)
+	except OSError:
+		pass
+	return index, tables
+
+def load_data_index() -> dict:
+	"""Load only the index from the cache, so importing the world doesn't unmarshal the full tables."""
+	try:
+		with open(data_cache_file(), "rb") as f:
+			if marshal.load(f) == data_cache_key():
+				index = marshal.load(f)
+				if isinstance(index, dict):
+					return index
+	except (OSError, EOFError, ValueError, TypeError):
+		pass
+	return parse_data_files()[0]
+
+@lru_cache(maxsize=None)
+def load_data_tables() -> dict:
+	"""Load the full tables, the last record of the cache. Called the first time any of them is accessed."""
+	try:
+		with open(data_cache_file(), "rb") as f:
+			if marshal.load(f) == data_cache_key():
+				marshal.load(f)
+				tables = marshal.load(f)
+				if isinstance(tables, dict):
+					return tables
+	except (OSError, EOFError, ValueError, TypeError):
+		pass
+	return parse_data_files()[1]
+
+_data_index = load_data_index()
+
+# Read-only, since every MinecraftWorld shares them
+item_name_to_id: Mapping[str, int] = MappingProxyType(_data_index["item_name_to_id"])
+location_name_to_id: Mapping[str, int] = MappingProxyType(_data_index["location_name_to_id"])
+
+default_connections = _data_index["default_connections"]
+illegal_connections = _data_index["illegal_connections"]
+
+def build_id_table(name_to_id: Mapping[str, int], offset: int) -> Tuple[Optional[str], ...]:
+	"""
+	Name of every id from `offset` up to the highest one, indexed by id - offset.
+	The ids are contiguous apart from historical gaps like the one before Bee Trap, which hold None.
+	"""
+	table: List[Optional[str]] = [None] * (max(name_to_id.values()) - offset + 1)
+	for name, code in name_to_id.items():
+		table[code - offset] = name
+	return tuple(table)
+
+item_id_to_name = build_id_table(item_name_to_id, item_id_offset)
+location_id_to_name = build_id_table(location_name_to_id, location_id_offset)
+
+def get_item_name(item_id: int) -> Optional[str]:
+	index = item_id - item_id_offset
+	return item_id_to_name[index] if 0 <= index < len(item_id_to_name) else None
+
+def get_location_name(location_id: int) -> Optional[str]:
+	index = location_id - location_id_offset
+	return location_id_to_name[index] if 0 <= index < len(location_id_to_name) else None
+
+def get_item_classification(item_id: int) -> Optional[ItemClassification]:
+	table = build_item_classification_table()
+	index = item_id - item_id_offset
+	return table[index] if 0 <= index < len(table) else None
+
+@lru_cache(maxsize=None)
+def build_item_table() -> dict:
+	item_info = load_data_tables()["item_info"]
+	# Classification and id of every item, so create_item is a single lookup.
+	# Later lists take precedence, matching progression over useful over trap.
+	item_table = {name: (ItemClassification.filler, item_id) for name, item_id in item_name_to_id.items()}
+	for key, classification in (("trap_items", ItemClassification.trap),
+	                            ("useful_items", ItemClassification.useful),
+	                            ("progression_items", ItemClassification.progression)):
+		for name in item_info[key]:
+			item_table[name] = (classification, item_name_to_id.get(name, None))
+	return item_table
+
+@lru_cache(maxsize=None)
+def build_item_classification_table() -> Tuple[Optional[ItemClassification], ...]:
+	# Laid out like item_id_to_name
+	item_table = build_item_table()
+	return tuple(None if name is None else item_table[name][0] for name in item_id_to_name)
+
+# The region graph every Minecraft slot gets, built once here so create_regions only has to instantiate it.
+# Locations keep the order of locations_by_region, which the fill order depends on.
+def build_region_template() -> tuple:
+	region_info = load_data_tables()["region_info"]
+	return tuple((region_name, tuple(exits)) for region_name, exits in region_info["regions"])
+
+def build_connection_template() -> tuple:
+	region_info = load_data_tables()["region_info"]
+	return tuple((entrance_name, region_name) \
+		for entrance_name, region_name in region_info["mandatory_connections"])
 
-location_info = load_data_file("locations.json")
-location_name_to_id = {name: location_id_offset + index \
-	for index, name in enumerate(location_info["all_locations"])}
+def build_location_template() -> tuple:
+	location_info = load_data_tables()["location_info"]
+	return tuple((region_name, tuple((name, location_name_to_id.get(name, None)) for name in names)) \
+		for region_name, names in location_info["locations_by_region"].items())
 
-exclusion_info = load_data_file("excluded_locations.json")
+# Everything else is built the first time it's accessed, so processes that only need the ID maps,
+# like WebHost workers importing every world, never load it.
+lazy_tables: Dict[str, Callable[[], Any]] = {
+	"item_info": lambda: load_data_tables()["item_info"],
+	"location_info": lambda: load_data_tables()["location_info"],
+	"exclusion_info": lambda: load_data_tables()["exclusion_info"],
+	"region_info": lambda: load_data_tables()["region_info"],
+	"rule_info": lambda: load_data_tables()["rule_info"],
+	"item_table": build_item_table,
+	"item_id_to_classification": build_item_classification_table,
+	"region_template": build_region_template,
+	"connection_template": build_connection_template,
+	"location_template": build_location_template,
+}
 
-region_info = load_data_file("regions.json")
+def __getattr__(name: str) -> Any:
+	if name not in lazy_tables:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	# cache it as a module attribute, so later accesses don't come back here
+	value = globals()[name] = lazy_tables[name]()
+	return value
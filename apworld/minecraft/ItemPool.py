@@ -1,5 +1,8 @@
+from bisect import bisect
+from functools import lru_cache
+from itertools import accumulate
 from math import ceil
-from typing import List
+from typing import List, Tuple
 
 from BaseClasses import Item
 
@@ -10,20 +13,34 @@ if TYPE_CHECKING:
 	from . import MinecraftWorld
 
 
-def get_junk_item_names(rand, k: int) -> str:
-	junk_weights = Constants.item_info["junk_weights"]
-	junk = rand.choices(
-		list(junk_weights.keys()),
-		weights=list(junk_weights.values()),
-		k=k)
-	return junk
+@lru_cache(maxsize=None)
+def get_junk_table() -> Tuple[Tuple[str, ...], Tuple[int, ...], float]:
+	# Junk item names and their cumulative weights, built once from items.json on first use.
+	# Drawing with these takes one rand.random() per item and maps it exactly like rand.choices with the plain
+	# weights does, so a given seed still produces the same junk items in the same order.
+	junk_cum_weights = tuple(accumulate(Constants.item_info["junk_weights"].values()))
+	return tuple(Constants.item_info["junk_weights"].keys()), junk_cum_weights, junk_cum_weights[-1] + 0.0
 
-def build_item_pool(world: "MinecraftWorld") -> List[Item]:
-	multiworld = world.multiworld
-	player = world.player
+def get_junk_item_names(rand, k: int) -> List[str]:
+	junk_names, junk_cum_weights, _ = get_junk_table()
+	return rand.choices(junk_names, cum_weights=junk_cum_weights, k=k)
+
+def get_junk_item_name(rand) -> str:
+	# same draw as get_junk_item_names(rand, 1)[0], without building a list
+	junk_names, junk_cum_weights, junk_total_weight = get_junk_table()
+	return junk_names[bisect(junk_cum_weights, rand.random() * junk_total_weight, 0, len(junk_names) - 1)]
 
+def get_unfilled_location_count(world: "MinecraftWorld") -> int:
+	# Count from the world's own index rather than every location in the multiworld,
+	# unless something else has added or removed locations in this player's regions
+	locations = world.locations_by_name.values()
+	if sum(len(region.locations) for region in world.regions_by_name.values()) != len(locations):
+		return len(world.multiworld.get_unfilled_locations(world.player))
+	return sum(1 for location in locations if location.item is None)
+
+def build_item_pool(world: "MinecraftWorld") -> List[Item]:
 	itempool = []
-	total_location_count = len(multiworld.get_unfilled_locations(player))
+	total_location_count = get_unfilled_location_count(world)
 
 	required_pool = Constants.item_info["required_pool"]
 
@@ -11,26 +11,23 @@ from subprocess import Popen
 from shutil import copyfile
 from time import strftime
 import logging
-from typing import Any
+from typing import Any, Tuple
 import tkinter as tk
 
 import requests
 import shlex
 import socket
-import time
 import tempfile
 import subprocess
 import threading
 
 import Utils
 from Utils import is_windows
-from worlds.LauncherComponents import Component, SuffixIdentifier, Type, components, launch_subprocess
+from worlds.LauncherComponents import launch_subprocess
 from settings import get_settings
 from .ui_prompts import yes_no, info
 
 
-atexit.register(input, "Press enter to exit.")
-
 # 1 or more digits followed by m or g, then optional b
 max_heap_re = re.compile(r"^\d+[mMgG][bB]?$")
 
@@ -58,49 +55,30 @@ def try_auto_launch_minecraft():
         print(f"[Minecraft Client] Failed to auto-launch Minecraft: {e}")
 
 
-def wait_for_server_ready(forge_dir: str, timeout: int = 120):
+def echo_server_output(server_process: Popen, server_ready: threading.Event) -> None:
     """
-    Wait until the Minecraft server prints the "Done (...)" line indicating it's fully started.
-    Only reacts to new log entries after this function is called.
+    Echo the server's output to the console for as long as it runs, which also keeps its stdout pipe from
+    filling up, and set `server_ready` once it prints the "Done (...)" line indicating it's fully started.
     """
-    log_file = os.path.join(forge_dir, "logs", "latest.log")
-    start_time = time.time()
-
-    # Wait until the log file exists
-    while not os.path.isfile(log_file):
-        if time.time() - start_time > timeout:
-            raise TimeoutError("Timeout waiting for latest.log to appear")
-        time.sleep(0.5)
-
-    print(f"[Minecraft Client] Waiting for server to be ready (reading {log_file})...")
-
-    # Track position in file
-    last_size = os.path.getsize(log_file)  # <-- start at the end, ignore old content
-
-    while True:
-        try:
-            current_size = os.path.getsize(log_file)
-            if current_size < last_size:
-                # Log was rotated/recreated
-                last_size = 0
-
-            with open(log_file, "r", encoding="utf-8") as f:
-                f.seek(last_size)
-                lines = f.readlines()
-                last_size = f.tell()
-
-            for line in lines:
-                if "Done (" in line and ")! For help, type \"help\"" in line:
-                    print("[Minecraft Client] Server is ready!")
-                    return
-
-        except (OSError, IOError):
-            pass  # File temporarily locked
+    for line in iter(server_process.stdout.readline, b""):
+        print(line.decode("utf-8", errors="replace"), end="", flush=True)
+        if b"Done (" in line and b")! For help, type \"help\"" in line:
+            server_ready.set()
+    # the server exited, so don't leave wait_for_server_ready waiting for its timeout
+    server_process.wait()
+    server_ready.set()
 
-        if time.time() - start_time > timeout:
-            raise TimeoutError("Timeout waiting for server to be ready")
 
-        time.sleep(0.5)
+def wait_for_server_ready(server_process: Popen, server_ready: threading.Event, timeout: int = 120):
+    """
+    Wait until the Minecraft server has fully started, as signalled by echo_server_output.
+    """
+    print("[Minecraft Client] Waiting for server to be ready...")
+    if not server_ready.wait(timeout):
+        raise TimeoutError("Timeout waiting for server to be ready")
+    if server_process.poll() is not None:
+        raise RuntimeError("Server exited before it was ready")
+    print("[Minecraft Client] Server is ready!")
 
 
 def find_ap_randomizer_jar(forge_dir):
@@ -342,8 +320,9 @@ def install_forge(directory, forge_version, java_version):
             os.remove(forge_install_jar)
 
 
-def run_forge_server(forge_dir: str, java_version: str, heap_arg: str, forge_version) -> Popen:
-    """Run the Forge server."""
+def run_forge_server(forge_dir: str, java_version: str, heap_arg: str,
+                     forge_version) -> Tuple[Popen, threading.Event]:
+    """Run the Forge server. Returns its process and an event set once it has started or exited."""
 
     java_exe = find_jdk(java_version)
     if not os.path.isfile(java_exe):
@@ -364,7 +343,10 @@ def run_forge_server(forge_dir: str, java_version: str, heap_arg: str, forge_ver
     args = [java_exe, heap_arg, *forge_args, "-nogui"]
     logging.info(f"Running Forge server: {args}")
     os.chdir(forge_dir)
-    return Popen(args)
+    server_process = Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    server_ready = threading.Event()
+    threading.Thread(target=echo_server_output, args=(server_process, server_ready), daemon=True).start()
+    return server_process, server_ready
 
 
 def get_minecraft_versions(version, release_channel="release"):
@@ -407,22 +389,12 @@ def is_correct_forge(forge_dir, forge_version) -> bool:
         return True
     return False
 
-def add_to_launcher_components():
-    component = Component(
-        "Minecraft Client",
-        func=run_client_threaded,
-        component_type=Type.CLIENT,
-        file_identifier=SuffixIdentifier(".apmc"),
-        cli=True
-    )
-    components.append(component)
-
-
 def run_client_threaded(*args):
     threading.Thread(target=run_client, args=args, daemon=True).start()
 
 
 def run_client(*args):
+    atexit.register(input, "Press enter to exit.")
     Utils.init_logging("MinecraftClient")
     parser = argparse.ArgumentParser()
     parser.add_argument("apmc_file", default=None, nargs='?', help="Path to an Archipelago Minecraft data file (.apmc)")
@@ -547,10 +519,10 @@ def run_client(*args):
     replace_apmc_files(forge_dir, apmc_file)
     check_eula(forge_dir)
     timeout = 90
-    server_process = run_forge_server(forge_dir, java_version, max_heap, forge_version)
+    server_process, server_ready = run_forge_server(forge_dir, java_version, max_heap, forge_version)
 
     # Wait for server to finish starting
-    wait_for_server_ready(forge_dir)
+    wait_for_server_ready(server_process, server_ready)
 
     # Auto-launch Minecraft
     try_auto_launch_minecraft()
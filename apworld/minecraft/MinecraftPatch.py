@@ -20,8 +20,16 @@ class MinecraftProcedurePatch(APProcedurePatch):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        patch_data = self._get_mc_data()
-        self.hash = hashlib.sha1(json.dumps(patch_data).encode()).hexdigest()
+        self.set_data(self._get_mc_data())
+
+    def set_data(self, data: dict) -> None:
+        """
+        Store the world data and serialise it once.
+        The same bytes become 'data.json' and are what the hash is taken over.
+        """
+        self.data = data
+        self.data_bytes = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.hash = hashlib.sha1(self.data_bytes).hexdigest()
 
     def write_contents(self, opened_zipfile):
         """
@@ -29,8 +37,7 @@ class MinecraftProcedurePatch(APProcedurePatch):
         'data.json' is the main payload used by the client mod.
         """
         # Store data.json in the patch files
-        data_bytes = json.dumps(self._get_mc_data(), ensure_ascii=False).encode("utf-8")
-        self.write_file("data.json", data_bytes)
+        self.write_file("data.json", self.data_bytes)
         # Call superclass to include manifest and procedure
         super().write_contents(opened_zipfile)
 
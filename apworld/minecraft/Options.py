@@ -1,6 +1,6 @@
 from Options import Choice, Toggle, DefaultOnToggle, Range, OptionList, DeathLink, PlandoConnections, \
     PerGameCommonOptions
-from .Constants import region_info
+from .Constants import default_connections, illegal_connections
 from dataclasses import dataclass
 
 
@@ -113,12 +113,12 @@ class StartingItems(OptionList):
 
 
 class MCPlandoConnections(PlandoConnections):
-    entrances = set(connection[0] for connection in region_info["default_connections"])
-    exits = set(connection[1] for connection in region_info["default_connections"])
+    entrances = set(connection[0] for connection in default_connections)
+    exits = set(connection[1] for connection in default_connections)
 
     @classmethod
     def can_connect(cls, entrance, exit):
-        if exit in region_info["illegal_connections"] and entrance in region_info["illegal_connections"][exit]:
+        if exit in illegal_connections and entrance in illegal_connections[exit]:
             return False
         return True
 
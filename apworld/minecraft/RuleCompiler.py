@@ -0,0 +1,221 @@
+from BaseClasses import CollectionState, MultiWorld
+
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from . import MinecraftWorld
+
+
+# A clause passes when every (item, count) threshold is met and every region and location is reachable.
+# A compiled rule passes when any one of its clauses does.
+Clause = Tuple[Tuple[Tuple[str, int], ...], Tuple[str, ...], Tuple[str, ...]]
+Requirements = List[Clause]
+# Rules are named like in Rules.get_rules_lookup: ("entrances" or "locations", name)
+RuleKey = Tuple[str, str]
+
+
+class RuleNotCompilable(Exception):
+    pass
+
+
+class RuleProbe:
+    """
+    Stands in for a CollectionState while a rule is explored.
+    Each query that earlier answers don't already settle is answered from `decisions`, and False once those
+    run out, so one call walks a single path through the rule.
+    """
+
+    def __init__(self, multiworld: MultiWorld, player: int, decisions: List[bool]):
+        self.multiworld = multiworld
+        self.player = player
+        self.decisions = decisions
+        self.answers: List[bool] = []
+        self.item_bounds: Dict[str, Tuple[int, Optional[int]]] = {}  # known lower (inclusive) and upper bound
+        self.regions: Dict[str, bool] = {}
+        self.locations: Dict[str, bool] = {}
+
+    def _decide(self) -> bool:
+        index = len(self.answers)
+        answer = self.decisions[index] if index < len(self.decisions) else False
+        self.answers.append(answer)
+        return answer
+
+    def _check_player(self, player: int) -> None:
+        if player != self.player:
+            raise RuleNotCompilable(f"Rule for player {self.player} queries player {player}")
+
+    def has(self, item: str, player: int, count: int = 1) -> bool:
+        self._check_player(player)
+        low, high = self.item_bounds.get(item, (0, None))
+        if count <= low:
+            return True
+        if high is not None and count >= high:
+            return False
+        answer = self._decide()
+        self.item_bounds[item] = (count, high) if answer else (low, count)
+        return answer
+
+    def can_reach_region(self, region_name: str, player: int) -> bool:
+        self._check_player(player)
+        if region_name not in self.regions:
+            self.regions[region_name] = self._decide()
+        return self.regions[region_name]
+
+    def can_reach_location(self, location_name: str, player: int) -> bool:
+        self._check_player(player)
+        if location_name not in self.locations:
+            self.locations[location_name] = self._decide()
+        return self.locations[location_name]
+
+    def __getattr__(self, name: str):
+        raise RuleNotCompilable(f"Rule uses unsupported state attribute {name}")
+
+    def clause(self) -> Clause:
+        return (tuple(sorted((item, low) for item, (low, _) in self.item_bounds.items() if low > 0)),
+                tuple(sorted(region for region, reached in self.regions.items() if reached)),
+                tuple(sorted(location for location, reached in self.locations.items() if reached)))
+
+
+def subsumes(clause: Clause, other: Clause) -> bool:
+    """True if every state meeting `other` also meets `clause`."""
+    other_items = dict(other[0])
+    return (all(other_items.get(item, 0) >= count for item, count in clause[0])
+            and set(clause[1]) <= set(other[1])
+            and set(clause[2]) <= set(other[2]))
+
+
+def compile_rule(rule: Callable[[CollectionState], bool], multiworld: MultiWorld, player: int) -> Requirements:
+    """
+    Explore every path through `rule` and return its requirements in disjunctive normal form.
+    The rules only ever test for having items and reaching places, so the set of queries answered True on
+    each passing path is a sufficient clause, and together those clauses are exactly equivalent to the rule.
+    """
+    clauses: Requirements = []
+    pending: List[List[bool]] = [[]]
+    while pending:
+        decisions = pending.pop()
+        probe = RuleProbe(multiworld, player, decisions)
+        result = rule(probe)
+        # every answer defaulted to False past the given decisions is a branch still to explore
+        for index in range(len(decisions), len(probe.answers)):
+            pending.append(probe.answers[:index] + [True])
+        if result:
+            clauses.append(probe.clause())
+
+    minimal: Requirements = []
+    for clause in sorted(set(clauses), key=lambda c: (len(c[0]) + len(c[1]) + len(c[2]), c)):
+        if not any(subsumes(kept, clause) for kept in minimal):
+            minimal.append(clause)
+    return minimal
+
+
+def requirements_rule(requirements: Requirements, player: int) -> Callable[[CollectionState], bool]:
+    """Build an access rule that checks `requirements` against the player's item counts."""
+    if not requirements:
+        return lambda state: False
+    if any(not items and not regions and not locations for items, regions, locations in requirements):
+        return lambda state: True
+
+    def rule(state: CollectionState) -> bool:
+        counts = state.prog_items[player]
+        for items, regions, locations in requirements:
+            for item, count in items:
+                if counts[item] < count:
+                    break
+            else:
+                for region in regions:
+                    if not state.can_reach_region(region, player):
+                        break
+                else:
+                    for location in locations:
+                        if not state.can_reach_location(location, player):
+                            break
+                    else:
+                        return True
+        return False
+
+    return rule
+
+
+def compile_requirements(world: "MinecraftWorld", rules_lookup: dict) -> Dict[str, Dict[str, Optional[Requirements]]]:
+    """Compile every rule in `rules_lookup`. Rules the compiler can't explore get None."""
+    compiled = {}
+    for kind, rules in rules_lookup.items():
+        compiled[kind] = {}
+        for name, rule in rules.items():
+            try:
+                compiled[kind][name] = compile_rule(rule, world.multiworld, world.player)
+            except RuleNotCompilable:
+                compiled[kind][name] = None
+    return compiled
+
+
+def requirements_lookup(world: "MinecraftWorld", rules_lookup: dict,
+                        requirements: Dict[str, Dict[str, Optional[Requirements]]]) -> dict:
+    """
+    Return a copy of `rules_lookup` with every rule replaced by a check of its compiled requirements.
+    Rules the compiler couldn't explore are kept as they are.
+    """
+    return {kind: {name: rule if requirements[kind][name] is None
+                   else requirements_rule(requirements[kind][name], world.player)
+                   for name, rule in rules.items()}
+            for kind, rules in rules_lookup.items()}
+
+
+def compile_rules_lookup(world: "MinecraftWorld", rules_lookup: dict) -> dict:
+    return requirements_lookup(world, rules_lookup, compile_requirements(world, rules_lookup))
+
+
+class RuleDependencies(NamedTuple):
+    items: Dict[str, Set[RuleKey]]  # item name -> rules testing for it
+    regions: Dict[str, Set[RuleKey]]  # region name -> rules testing whether it can be reached
+    locations: Dict[str, Set[RuleKey]]  # location name -> rules testing whether it can be reached
+    unknown: Set[RuleKey]  # rules that couldn't be compiled, so may depend on anything
+
+
+def build_dependency_index(requirements: Dict[str, Dict[str, Optional[Requirements]]]) -> RuleDependencies:
+    dependencies = RuleDependencies({}, {}, {}, set())
+    for kind, rules in requirements.items():
+        for name, clauses in rules.items():
+            if clauses is None:
+                dependencies.unknown.add((kind, name))
+                continue
+            for items, regions, locations in clauses:
+                for item, _ in items:
+                    dependencies.items.setdefault(item, set()).add((kind, name))
+                for region in regions:
+                    dependencies.regions.setdefault(region, set()).add((kind, name))
+                for location in locations:
+                    dependencies.locations.setdefault(location, set()).add((kind, name))
+    return dependencies
+
+
+def locations_affected_by_items(world: "MinecraftWorld", dependencies: RuleDependencies) -> Optional[Dict[str, Set[str]]]:
+    """
+    Map each item name to every location whose reachability can change when that item is collected or removed.
+    Besides the rules testing for the item directly, this follows entrances into the regions behind them, and
+    rules testing for the reachability of anything affected. Returns None when some rule's dependencies are unknown.
+    """
+    if dependencies.unknown:
+        return None
+    affected_by = {}
+    for item, rules in dependencies.items.items():
+        affected = set()
+        seen = set()
+        pending = list(rules)
+        while pending:
+            key = pending.pop()
+            if key in seen:
+                continue
+            seen.add(key)
+            kind, name = key
+            if kind == "locations":
+                affected.add(name)
+                pending.extend(dependencies.locations.get(name, ()))
+            else:
+                region = world.entrances_by_name[name].connected_region
+                pending.extend(("locations", location.name) for location in region.locations)
+                pending.extend(("entrances", entrance.name) for entrance in region.exits)
+                pending.extend(dependencies.regions.get(region.name, ()))
+        affected_by[item] = affected
+    return affected_by
@@ -0,0 +1,84 @@
+import csv
+import json
+import os
+from time import perf_counter
+
+from BaseClasses import CollectionState
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Rules are named like in Rules.get_rules_lookup: ("entrances" or "locations", name)
+RuleKey = Tuple[str, str]
+
+PROFILE_ENVIRONMENT_VARIABLE = "MC_RULE_PROFILE"
+PROFILE_FORMATS = ("json", "csv")
+REPORT_FIELDS = ("kind", "name", "calls", "seconds", "true", "false", "true_ratio")
+
+
+def profile_format(setting: str) -> Optional[str]:
+    """
+    Return the report format requested by the environment variable, or failing that the host setting,
+    or None when profiling is off.
+    """
+    requested = (os.environ.get(PROFILE_ENVIRONMENT_VARIABLE) or setting).strip().lower()
+    if not requested:
+        return None
+    if requested not in PROFILE_FORMATS:
+        raise ValueError(f"Unknown Minecraft rule profile format {requested}, expected one of {PROFILE_FORMATS}")
+    return requested
+
+
+class RuleProfiler:
+    """
+    Counts calls, true results and wall time for every rule it wraps.
+    Rules are only wrapped when profiling is on, so it costs nothing otherwise.
+    Times are inclusive: an entrance rule checking whether a region can be reached also pays for the sweep
+    that answers it, including the other rules that sweep evaluates.
+    """
+
+    def __init__(self):
+        self.stats: Dict[RuleKey, List] = {}  # [calls, true results, seconds]
+
+    def wrap(self, key: RuleKey, rule: Callable[[CollectionState], bool]) -> Callable[[CollectionState], bool]:
+        stats = self.stats.setdefault(key, [0, 0, 0.0])
+
+        def profiled_rule(state: CollectionState) -> bool:
+            start = perf_counter()
+            result = rule(state)
+            stats[2] += perf_counter() - start
+            stats[0] += 1
+            if result:
+                stats[1] += 1
+            return result
+
+        return profiled_rule
+
+    def wrap_lookup(self, rules_lookup: dict) -> dict:
+        return {kind: {name: self.wrap((kind, name), rule) for name, rule in rules.items()}
+                for kind, rules in rules_lookup.items()}
+
+    def report(self) -> List[dict]:
+        """One row per rule, the most expensive first."""
+        rows = []
+        for (kind, name), (calls, true, seconds) in self.stats.items():
+            rows.append({
+                "kind": kind,
+                "name": name,
+                "calls": calls,
+                "seconds": seconds,
+                "true": true,
+                "false": calls - true,
+                "true_ratio": true / calls if calls else 0.0,
+            })
+        rows.sort(key=lambda row: (-row["seconds"], -row["calls"], row["kind"], row["name"]))
+        return rows
+
+    def write(self, path: str, file_format: str) -> None:
+        rows = self.report()
+        with open(path, "w", newline="") as file:
+            if file_format == "csv":
+                writer = csv.DictWriter(file, fieldnames=REPORT_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                json.dump(rows, file, indent=2)
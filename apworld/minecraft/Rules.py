@@ -1,479 +1,386 @@
-from BaseClasses import CollectionState
+import logging
+from collections import Counter, OrderedDict
+from functools import lru_cache
+
+from BaseClasses import CollectionState, Location, MultiWorld
+from worlds.AutoWorld import LogicMixin
 from worlds.generic.Rules import exclusion_rules
 
 from . import Constants
-from typing import TYPE_CHECKING
+from .RuleCompiler import Requirements, compile_requirements, requirements_lookup, build_dependency_index, \
+    locations_affected_by_items
+from .RuleProfiler import RuleProfiler, profile_format
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
 
 if TYPE_CHECKING:
     from . import MinecraftWorld
 
 
-# Helper functions
-# moved from logicmixin
-
-def has_iron_ingots(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return state.has('Progressive Tools', player) and state.has('Progressive Resource Crafting', player)
-
-
-def has_copper_ingots(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return state.has('Progressive Tools', player) and state.has('Progressive Resource Crafting', player)
-
-
-def has_gold_ingots(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return (state.has('Progressive Resource Crafting', player)
-            and (
-                    state.has('Progressive Tools', player, 2)
-                    or state.can_reach_region('The Nether', player)
-            )
-           )
-
-
-def has_diamond_pickaxe(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return state.has('Progressive Tools', player, 3) and has_iron_ingots(world, state, player)
-
-
-def craft_crossbow(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return state.has('Archery', player) and has_iron_ingots(world, state, player)
-
-
-def has_bottle(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return state.has('Bottles', player) and state.has('Progressive Resource Crafting', player)
-
-
-def has_spyglass(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return (has_copper_ingots(world, state, player)
-            and state.has('Spyglass', player)
-            and can_adventure(world, state, player)
-           )
-
-
-def can_enchant(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return state.has('Enchanting', player) and has_diamond_pickaxe(world, state, player)  # mine obsidian and lapis
-
-
-def can_use_anvil(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return (state.has('Enchanting', player)
-            and state.has('Progressive Resource Crafting', player,2)
-            and has_iron_ingots(world, state, player)
-           )
-
-
-def fortress_loot(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:  # saddles, blaze rods, wither skulls
-    return state.can_reach_region('Nether Fortress', player) and basic_combat(world, state, player)
-
-
-def can_brew_potions(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return state.has('Blaze Rods', player) and state.has('Brewing', player) and has_bottle(world, state, player)
-
-
-def can_piglin_trade(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return (has_gold_ingots(world, state, player)
-            and (
-                    state.can_reach_region('The Nether', player)
-                    or state.can_reach_region('Bastion Remnant', player)
-            ))
-
-
-def overworld_villager(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    village_region = state.multiworld.get_region('Village', player).entrances[0].parent_region.name
-    if village_region == 'The Nether':  # 2 options: cure zombie villager or build portal in village
-        return (state.can_reach_location('Zombie Doctor',  player)
-                or (
-                        has_diamond_pickaxe(world, state, player)
-                        and state.can_reach_region('Village', player)
-                ))
-    elif village_region == 'The End':
-        return state.can_reach_location('Zombie Doctor', player)
-    return state.can_reach_region('Village', player)
-
-
-def enter_stronghold(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return state.has('Blaze Rods', player) and state.has('Brewing', player) and state.has('3 Ender Pearls', player)
-
-
-# Difficulty-dependent functions
-def combat_difficulty(world: "MinecraftWorld", state: CollectionState, player: int) -> str:
-    return world.options.combat_difficulty.current_key
-
-
-def can_adventure(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    death_link_check = not world.options.death_link or state.has('Bed', player)
-    if combat_difficulty(world, state, player) == 'easy':
-        return state.has('Progressive Weapons', player, 2) and has_iron_ingots(world, state, player) and death_link_check
-    elif combat_difficulty(world, state, player) == 'hard':
-        return True
-    return (state.has('Progressive Weapons', player) and death_link_check and
-            (state.has('Progressive Resource Crafting', player) or state.has('Campfire', player)))
-
-
-def basic_combat(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    if combat_difficulty(world, state, player) == 'easy':
-        return (state.has('Progressive Weapons', player, 2)
-                and state.has('Progressive Armor', player)
-                and state.has('Shield', player)
-                and has_iron_ingots(world, state, player)
-               )
-    elif combat_difficulty(world, state, player) == 'hard':
-        return True
-    return (state.has('Progressive Weapons', player)
-            and (
-                    state.has('Progressive Armor', player)
-                    or state.has('Shield', player)
-            )
-            and has_iron_ingots(world, state, player)
-           )
-
-
-def complete_raid(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    reach_regions = (state.can_reach_region('Village', player)
-                     and state.can_reach_region('Pillager Outpost', player))
-    if combat_difficulty(world, state, player) == 'easy':
-        return (reach_regions
-                and state.has('Progressive Weapons', player, 3)
-                and state.has('Progressive Armor', player, 2)
-                and state.has('Shield', player)
-                and state.has('Archery', player)
-                and state.has('Progressive Tools', player, 2)
-                and has_iron_ingots(world, state, player)
-               )
-    elif combat_difficulty(world, state, player) == 'hard':  # might be too hard?
-        return (reach_regions
-                and state.has('Progressive Weapons', player, 2)
-                and has_iron_ingots(world, state, player)
-                and (
-                        state.has('Progressive Armor', player)
-                        or state.has('Shield', player)
-                )
-               )
-    return (reach_regions
-            and state.has('Progressive Weapons', player, 2)
-            and has_iron_ingots(world, state, player)
-            and state.has('Progressive Armor', player)
-            and state.has('Shield', player)
-           )
-
-
-def can_kill_wither(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    normal_kill = (state.has("Progressive Weapons", player, 3)
-                   and state.has("Progressive Armor", player, 2)
-                   and can_brew_potions(world, state, player)
-                   and can_enchant(world, state, player)
-                  )
-    if combat_difficulty(world, state, player) == 'easy':
-        return (fortress_loot(world, state, player)
-                and normal_kill
-                and state.has('Archery', player)
-               )
-    elif combat_difficulty(world, state, player) == 'hard':  # cheese kill using bedrock ceilings
-        return (fortress_loot(world, state, player)
-                and (
-                        normal_kill
-                        or state.can_reach_region('The Nether', player)
-                        or state.can_reach_region('The End', player)
-                )
-               )
-
-    return fortress_loot(world, state, player) and normal_kill
-
-
-def can_respawn_ender_dragon(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    return (state.can_reach_region('The Nether', player)
-            and state.can_reach_region('The End', player)
-            and state.has('Progressive Resource Crafting', player)  # smelt sand into glass
-           )
-
-
-def can_kill_ender_dragon(world: "MinecraftWorld", state: CollectionState, player: int) -> bool:
-    if combat_difficulty(world, state, player) == 'easy':
-        return (state.has("Progressive Weapons", player, 3)
-                and state.has("Progressive Armor", player, 2)
-                and state.has('Archery', player)
-                and can_brew_potions(world, state, player)
-                and can_enchant(world, state, player)
-               )
-    if combat_difficulty(world, state, player) == 'hard':
-        return (
-                (
-                  state.has('Progressive Weapons', player, 2)
-                  and state.has('Progressive Armor', player)
-                ) or (
-                  state.has('Progressive Weapons', player, 1)
-                  and state.has('Bed', player)  # who needs armor when you can respawn right outside the chamber
-                )
-               )
-    return (state.has('Progressive Weapons', player, 2)
-            and state.has('Progressive Armor', player)
-            and state.has('Archery', player)
-           )
-
-
-def has_structure_compass(world: "MinecraftWorld", state: CollectionState, entrance_name: str, player: int) -> bool:
-    if not world.options.structure_compasses:
-        return True
-    return state.has(f"Structure Compass ({state.multiworld.get_entrance(entrance_name, player).connected_region.name})", player)
-
-
-def get_rules_lookup(world, player: int):
-    rules_lookup = {
-        "entrances": {
-            "Nether Portal": lambda state: state.has('Flint and Steel', player)
-                                           and (
-                                                   state.has('Bucket', player)
-                                                   or state.has('Progressive Tools', player, 3)
-                                           )
-                                           and has_iron_ingots(world, state, player),
-            "End Portal": lambda state: enter_stronghold(world, state, player)
-                                        and state.has('3 Ender Pearls', player, 4),
-            "Overworld Structure 1": lambda state: can_adventure(world, state, player)
-                                                   and has_structure_compass(world, state, "Overworld Structure 1", player),
-            "Overworld Structure 2": lambda state: can_adventure(world, state, player)
-                                                   and has_structure_compass(world, state, "Overworld Structure 2", player),
-            "Nether Structure 1": lambda state: can_adventure(world, state, player)
-                                                and has_structure_compass(world, state, "Nether Structure 1", player),
-            "Nether Structure 2": lambda state: can_adventure(world, state, player)
-                                                and has_structure_compass(world, state, "Nether Structure 2", player),
-            "The End Structure": lambda state: can_adventure(world, state, player)
-                                               and has_structure_compass(world, state, "The End Structure", player),
-        },
-        "locations": {
-            "Ender Dragon": lambda state: can_respawn_ender_dragon(world, state, player)
-                                          and can_kill_ender_dragon(world, state, player),
-            "Wither": lambda state: can_kill_wither(world, state, player),
-            "Blaze Rods": lambda state: fortress_loot(world, state, player),
-            "Who is Cutting Onions?": lambda state: can_piglin_trade(world, state, player),
-            "Oh Shiny": lambda state: can_piglin_trade(world, state, player),
-            "Suit Up": lambda state: state.has("Progressive Armor", player)
-                                     and has_iron_ingots(world, state, player),
-            "Very Very Frightening": lambda state: state.has("Channeling Book", player)
-                                                   and can_use_anvil(world, state, player)
-                                                   and can_enchant(world, state, player)
-                                                   and overworld_villager(world, state, player),
-            "Hot Stuff": lambda state: state.has("Bucket", player)
-                                       and has_iron_ingots(world, state, player),
-            "Free the End": lambda state: can_respawn_ender_dragon(world, state, player)
-                                          and can_kill_ender_dragon(world, state, player),
-            "A Furious Cocktail": lambda state: (can_brew_potions(world, state, player)
-                                                 and state.has("Fishing Rod", player)  # Water Breathing
-                                                 and state.can_reach_region("The Nether", player)  # Regeneration, Fire Resistance, gold nuggets
-                                                 and state.can_reach_region("Village", player)  # Night Vision, Invisibility
-                                                 and state.can_reach_location("Bring Home the Beacon", player)),
-            # Resistance
-            "Bring Home the Beacon": lambda state: can_kill_wither(world, state, player)
-                                                   and has_diamond_pickaxe(world, state, player)
-                                                   and state.has("Progressive Resource Crafting", player, 2),
-            "Not Today, Thank You": lambda state: state.has("Shield", player)
-                                                  and has_iron_ingots(world, state, player),
-            "Isn't It Iron Pick": lambda state: state.has("Progressive Tools", player, 2)
-                                                and has_iron_ingots(world, state, player),
-            "Local Brewery": lambda state: can_brew_potions(world, state, player),
-            "The Next Generation": lambda state: can_respawn_ender_dragon(world, state, player)
-                                                 and can_kill_ender_dragon(world, state, player),
-            "Fishy Business": lambda state: state.has("Fishing Rod", player),
-            "This Boat Has Legs": lambda state: (
-                                                    fortress_loot(world, state, player)
-                                                    or complete_raid(world, state, player)
-                                                 )
-                                                and state.has("Saddle", player)
-                                                and state.has("Fishing Rod", player),
-            "Sniper Duel": lambda state: state.has("Archery", player),
-            "Great View From Up Here": lambda state: basic_combat(world, state, player),
-            "How Did We Get Here?": lambda state: (can_brew_potions(world, state, player)
-                                                   and has_gold_ingots(world, state, player)  # Absorption
-                                                   and state.can_reach_region('End City', player)  # Levitation
-                                                   and state.can_reach_region('The Nether', player)  # potion ingredients
-                                                   and state.has("Fishing Rod", player)  # Pufferfish, Nautilus Shells; spectral arrows
-                                                   and state.has("Archery", player)
-                                                   and state.can_reach_location("Bring Home the Beacon", player)  # Haste
-                                                   and state.can_reach_location("Hero of the Village", player)),  # Bad Omen, Hero of the Village
-            "Bullseye": lambda state: state.has("Archery", player)
-                                      and state.has("Progressive Tools", player, 2)
-                                      and has_iron_ingots(world, state, player),
-            "Spooky Scary Skeleton": lambda state: basic_combat(world, state, player),
-            "Two by Two": lambda state: has_iron_ingots(world, state, player)
-                                        and state.has("Bucket", player)
-                                        and can_adventure(world, state, player),
-            "Two Birds, One Arrow": lambda state: craft_crossbow(world, state, player)
-                                                  and can_enchant(world, state, player),
-            "Who's the Pillager Now?": lambda state: craft_crossbow(world, state, player),
-            "Getting an Upgrade": lambda state: state.has("Progressive Tools", player),
-            "Tactical Fishing": lambda state: state.has("Bucket", player)
-                                              and has_iron_ingots(world, state, player),
-            "Zombie Doctor": lambda state: can_brew_potions(world, state, player)
-                                           and has_gold_ingots(world, state, player),
-            "Ice Bucket Challenge": lambda state: has_diamond_pickaxe(world, state, player),
-            "Into Fire": lambda state: basic_combat(world, state, player),
-            "War Pigs": lambda state: basic_combat(world, state, player),
-            "Take Aim": lambda state: state.has("Archery", player),
-            "Total Beelocation": lambda state: state.has("Silk Touch Book", player)
-                                               and can_use_anvil(world, state, player)
-                                               and can_enchant(world, state, player),
-            "Arbalistic": lambda state: (craft_crossbow(world, state, player)
-                                         and state.has("Piercing IV Book", player)
-                                         and can_use_anvil(world, state, player)
-                                         and can_enchant(world, state, player)
-                                         ),
-            "The End... Again...": lambda state: can_respawn_ender_dragon(world, state, player)
-                                                 and can_kill_ender_dragon(world, state, player),
-            "Acquire Hardware": lambda state: has_iron_ingots(world, state, player),
-            "Not Quite \"Nine\" Lives": lambda state: can_piglin_trade(world, state, player)
-                                                      and state.has("Progressive Resource Crafting", player, 2),
-            "Cover Me With Diamonds": lambda state: state.has("Progressive Armor", player, 2)
-                                                    and state.has("Progressive Tools", player, 2)
-                                                    and has_iron_ingots(world, state, player),
-            "Sky's the Limit": lambda state: basic_combat(world, state, player),
-            "Hired Help": lambda state: state.has("Progressive Resource Crafting", player, 2)
-                                        and has_iron_ingots(world, state, player),
-            "Sweet Dreams": lambda state: state.has("Bed", player)
-                                          or state.can_reach_region('Village', player),
-            "You Need a Mint": lambda state: can_respawn_ender_dragon(world, state, player)
-                                             and has_bottle(world, state, player),
-            "Monsters Hunted": lambda state: (can_respawn_ender_dragon(world, state, player)
-                                              and can_kill_ender_dragon(world, state, player)
-                                              and can_kill_wither(world, state, player)
-                                              and state.has("Fishing Rod", player)),
-            "Enchanter": lambda state: can_enchant(world, state, player),
-            "Voluntary Exile": lambda state: basic_combat(world, state, player),
-            "Eye Spy": lambda state: enter_stronghold(world, state, player),
-            "Serious Dedication": lambda state: (can_brew_potions(world, state, player)
-                                                 and state.has("Bed", player)
-                                                 and has_diamond_pickaxe(world, state, player)
-                                                 and has_gold_ingots(world, state, player)),
-            "Postmortal": lambda state: complete_raid(world, state, player),
-            "Adventuring Time": lambda state: can_adventure(world, state, player),
-            "Hero of the Village": lambda state: complete_raid(world, state, player),
-            "Hidden in the Depths": lambda state: can_brew_potions(world, state, player)
-                                                  and state.has("Bed", player)
-                                                  and has_diamond_pickaxe(world, state, player),
-            "Beaconator": lambda state: (can_kill_wither(world, state, player)
-                                         and has_diamond_pickaxe(world, state, player)
-                                         and state.has("Progressive Resource Crafting", player, 2)),
-            "Withering Heights": lambda state: can_kill_wither(world, state, player),
-            "A Balanced Diet": lambda state: (has_bottle(world, state, player)
-                                              and has_gold_ingots(world, state, player)
-                                              and state.has("Progressive Resource Crafting", player, 2)
-                                              and state.can_reach_region('The End', player)),
-            # notch apple, chorus fruit
-            "Subspace Bubble": lambda state: has_diamond_pickaxe(world, state, player),
-            "Country Lode, Take Me Home": lambda state: state.can_reach_location("Hidden in the Depths", player)
-                                                        and has_gold_ingots(world, state, player),
-            "Bee Our Guest": lambda state: state.has("Campfire", player)
-                                           and has_bottle(world, state, player),
-            "Uneasy Alliance": lambda state: has_diamond_pickaxe(world, state, player)
-                                             and state.has('Fishing Rod', player),
-            "Diamonds!": lambda state: state.has("Progressive Tools", player, 2)
-                                       and has_iron_ingots(world, state, player),
-            "A Throwaway Joke": lambda state: can_adventure(world, state, player),
-            "Sticky Situation": lambda state: state.has("Campfire", player)
-                                              and has_bottle(world, state, player),
-            "Ol' Betsy": lambda state: craft_crossbow(world, state, player),
-            "Cover Me in Debris": lambda state: state.has("Progressive Armor", player, 2)
-                                                and state.has("8 Netherite Scrap", player, 2)
-                                                and state.has("Progressive Resource Crafting", player)
-                                                and has_diamond_pickaxe(world, state, player)
-                                                and has_iron_ingots(world, state, player)
-                                                and can_brew_potions(world, state, player)
-                                                and state.has("Bed", player),
-            "Hot Topic": lambda state: state.has("Progressive Resource Crafting", player),
-            "The Lie": lambda state: has_iron_ingots(world, state, player)
-                                     and state.has("Bucket", player),
-            "On a Rail": lambda state: has_iron_ingots(world, state, player)
-                                       and state.has('Progressive Tools', player, 2),
-            "When Pigs Fly": lambda state:  (
-                                                fortress_loot(world, state, player)
-                                                or complete_raid(world, state, player)
-                                            )
-                                            and state.has("Saddle", player)
-                                            and state.has("Fishing Rod", player)
-                                            and can_adventure(world, state, player),
-            "Overkill": lambda state: can_brew_potions(world, state, player)
-                                       and (
-                                               state.has("Progressive Weapons", player)
-                                               or state.can_reach_region('The Nether', player)
-                                       ),
-            "Librarian": lambda state: state.has("Enchanting", player),
-            "Overpowered": lambda state: has_iron_ingots(world, state, player)
-                                         and state.has('Progressive Tools', player, 2)
-                                         and basic_combat(world, state, player),
-            "Wax On": lambda state: has_copper_ingots(world, state, player)
-                                    and state.has('Campfire', player)
-                                    and state.has('Progressive Resource Crafting', player, 2),
-            "Wax Off": lambda state: has_copper_ingots(world, state, player)
-                                     and state.has('Campfire', player)
-                                     and state.has('Progressive Resource Crafting', player, 2),
-            "The Cutest Predator": lambda state: has_iron_ingots(world, state, player)
-                                                 and state.has('Bucket', player),
-            "The Healing Power of Friendship": lambda state: has_iron_ingots(world, state, player)
-                                                             and state.has('Bucket', player),
-            "Is It a Bird?": lambda state: has_spyglass(world, state, player)
-                                           and can_adventure(world, state, player),
-            "Is It a Balloon?": lambda state: has_spyglass(world, state, player),
-            "Is It a Plane?": lambda state: has_spyglass(world, state, player)
-                                            and can_respawn_ender_dragon(world, state, player),
-            "Surge Protector": lambda state: state.has("Channeling Book", player)
-                                             and can_use_anvil(world, state, player)
-                                             and can_enchant(world, state, player)
-                                             and overworld_villager(world, state, player),
-            "Light as a Rabbit": lambda state: can_adventure(world, state, player)
-                                               and has_iron_ingots(world, state, player)
-                                               and state.has('Bucket', player),
-            "Glow and Behold!": lambda state: can_adventure(world, state, player),
-            "Whatever Floats Your Goat!": lambda state: can_adventure(world, state, player),
-            "Caves & Cliffs": lambda state: has_iron_ingots(world, state, player)
-                                            and state.has('Bucket', player)
-                                            and state.has('Progressive Tools', player, 2),
-            "Feels like home": lambda state: has_iron_ingots(world, state, player)
-                                              and state.has('Bucket', player)
-                                              and state.has('Fishing Rod', player)
-                                              and (
-                                                fortress_loot(world, state, player)
-                                                or complete_raid(world, state, player)
-                                              )
-                                              and state.has("Saddle", player),
-            "Sound of Music": lambda state: state.has("Progressive Tools", player, 2)
-                                            and has_iron_ingots(world, state, player)
-                                            and basic_combat(world, state, player),
-            "Star Trader": lambda state: has_iron_ingots(world, state, player)
-                                         and state.has('Bucket', player)
-                                         and (
-                                           state.can_reach_region("The Nether", player)  # soul sand in nether
-                                           or state.can_reach_region("Nether Fortress", player)  # soul sand in fortress if not in nether for water elevator
-                                           or can_piglin_trade(world, state, player)  # piglins give soul sand
-                                         )
-                                         and overworld_villager(world, state, player),
-            "Birthday Song": lambda state: state.can_reach_location("The Lie", player)
-                                           and state.has("Progressive Tools", player, 2)
-                                           and has_iron_ingots(world, state, player),
-            "Bukkit Bukkit": lambda state: state.has("Bucket", player)
-                                           and has_iron_ingots(world, state, player)
-                                           and can_adventure(world, state, player),
-            "It Spreads": lambda state: can_adventure(world, state, player)
-                                        and has_iron_ingots(world, state, player)
-                                        and state.has("Progressive Tools", player, 2),
-            "Sneak 100": lambda state: can_adventure(world, state, player)
-                                       and has_iron_ingots(world, state, player)
-                                       and state.has("Progressive Tools", player, 2),
-            "When the Squad Hops into Town": lambda state: can_adventure(world, state, player)
-                                                           and state.has("Lead", player),
-            "With Our Powers Combined!": lambda state: can_adventure(world, state, player)
-                                                       and state.has("Lead", player),
-        }
-    }
-    return rules_lookup
+RULE_BACKENDS = ("lambda", "compiled")
+
+
+def rule_backend(setting: str) -> str:
+    """Return the rule backend the host setting asks for."""
+    backend = setting.strip().lower()
+    if backend not in RULE_BACKENDS:
+        raise ValueError(f"Unknown Minecraft rule backend {setting}, expected one of {RULE_BACKENDS}")
+    return backend
+
+
+# Flags recording how a player's items changed since their advancement count was last taken
+ADVANCEMENTS_GAINED = 1
+ADVANCEMENTS_LOST = 2
+
+
+class MinecraftLogic(LogicMixin):
+    # reachable advancement locations per Minecraft player, kept up to date by MinecraftWorld.collect/remove
+    mc_reached_advancements: Dict[int, Set[Location]]
+    mc_advancements_dirty: Dict[int, int]
+    # progression items collected or removed since the last count, None when anything may have changed
+    mc_changed_items: Dict[int, Optional[Set[str]]]
+    # player's item counts as a hashable key for HelperCache, None until needed after a change
+    mc_item_signatures: Dict[int, Optional[FrozenSet[Tuple[str, int]]]]
+
+    def init_mixin(self, multiworld: MultiWorld) -> None:
+        # Item link groups are included, since their linked items are collected through MinecraftWorld.collect too
+        players = [player for player in multiworld.get_all_ids() if multiworld.game[player] == "Minecraft"]
+        self.mc_reached_advancements = {player: set() for player in players}
+        self.mc_advancements_dirty = {player: ADVANCEMENTS_GAINED for player in players}
+        self.mc_changed_items = {player: None for player in players}
+        self.mc_item_signatures = {player: None for player in players}
+
+    def copy_mixin(self, new_state: CollectionState) -> CollectionState:
+        new_state.mc_reached_advancements = {player: reached.copy()
+                                             for player, reached in self.mc_reached_advancements.items()}
+        new_state.mc_advancements_dirty = self.mc_advancements_dirty.copy()
+        new_state.mc_changed_items = {player: None if changed is None else changed.copy()
+                                      for player, changed in self.mc_changed_items.items()}
+        new_state.mc_item_signatures = self.mc_item_signatures.copy()
+        return new_state
+
+
+def mark_advancements_dirty(state: CollectionState, player: int, item_name: str, flag: int) -> None:
+    state.mc_advancements_dirty[player] |= flag
+    changed = state.mc_changed_items[player]
+    if changed is not None:
+        changed.add(item_name)
+    state.mc_item_signatures[player] = None
+
+
+def item_signature(state: CollectionState, player: int) -> FrozenSet[Tuple[str, int]]:
+    signature = state.mc_item_signatures[player]
+    if signature is None:
+        signature = state.mc_item_signatures[player] = frozenset(state.prog_items[player].items())
+    return signature
+
+
+class HelperCache:
+    """
+    Bounded cache of helper predicate results for one player, keyed on the helper, its arguments and the
+    player's item counts. The rules only depend on the player's own items, so results stay valid in every
+    state with the same counts and the cache is shared by all states. The least recently used results are
+    evicted once `size` is exceeded.
+    """
+
+    def __init__(self, player: int, size: int):
+        self.player = player
+        self.size = size
+        self.results: OrderedDict = OrderedDict()
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def memoize(self, helper: Callable[..., bool]) -> Callable[..., bool]:
+        name = helper.__name__
+        player = self.player
+        results = self.results
+
+        def memoized_helper(world: "MinecraftWorld", state: CollectionState, *args) -> bool:
+            key = (name, item_signature(state, player), args)
+            result = results.get(key)
+            if result is not None:
+                results.move_to_end(key)
+                self.hits[name] += 1
+                return result
+            self.misses[name] += 1
+            result = results[key] = bool(helper(world, state, *args))
+            if len(results) > self.size:
+                results.popitem(last=False)
+            return result
+
+        memoized_helper.__name__ = name
+        return memoized_helper
+
+    def stats(self) -> Dict[str, Tuple[int, float]]:
+        """Evaluations and hit rate per helper."""
+        return {name: (self.hits[name] + self.misses[name],
+                       self.hits[name] / (self.hits[name] + self.misses[name]))
+                for name in sorted(self.hits.keys() | self.misses.keys())}
+
+
+# Rule data
+# Every access rule is declared in data/rules.json as an expression, one of
+#   true, false
+#   {"has": item, "count": n}                   the player has n (default 1) of the item
+#   {"region": name}, {"location": name}        the region or location can be reached
+#   {"helper": name}                            the expression declared under that name in "helpers"
+#   {"all": [...]}, {"any": [...]}
+#   {"switch": setting, "cases": {value: expression, ...}, "default": expression}
+#                                               picks a case by one of the RuleSettings below
+#   {"structure_compass": entrance}             the compass for the structure behind the entrance, if compasses are on
+# Any expression object may also have a "comment", which is ignored.
+# The data is parsed once, on first use by get_rule_data. For each combination of settings the expressions are
+# resolved into a flat Python expression per rule, which is compiled once and shared by every player with those
+# settings.
+
+# Parsed expressions are tuples: (TRUE,), (FALSE,), (HAS, item, count), (REGION, name), (LOCATION, name),
+# (HELPER, name), (ALL, children), (ANY, children), (SWITCH, setting, cases, default), (COMPASS, entrance)
+TRUE, FALSE, HAS, REGION, LOCATION, HELPER, ALL, ANY, SWITCH, COMPASS = range(10)
+Expression = Tuple
+
+# Helpers whose results HelperCache stores: those checking a location, three or more regions, or eight or more
+# terms once nested helpers are inlined. The others are cheaper to evaluate than their item signature is to build.
+MEMOIZED_HELPERS = frozenset({"can_piglin_trade", "complete_raid", "can_kill_wither", "overworld_villager",
+                              "defeat_dragon", "channeling_trident", "ride_strider", "build_beacon"})
+
+
+class RuleSettings(NamedTuple):
+    combat_difficulty: str
+    death_link: str  # "true" or "false"
+    structure_compasses: str  # "true" or "false"
+    village_dimension: str  # region the Village was placed in
+
+
+def parse_rule(expression, helpers: Set[str]) -> Expression:
+    if expression is True:
+        return TRUE,
+    if expression is False:
+        return FALSE,
+    if not isinstance(expression, dict):
+        raise ValueError(f"Invalid Minecraft rule expression {expression!r}")
+    keys = expression.keys() - {"comment"}
+    if keys <= {"has", "count"} and "has" in keys:
+        return HAS, expression["has"], expression.get("count", 1)
+    if keys == {"region"}:
+        return REGION, expression["region"]
+    if keys == {"location"}:
+        return LOCATION, expression["location"]
+    if keys == {"helper"}:
+        if expression["helper"] not in helpers:
+            raise ValueError(f"Unknown Minecraft rule helper {expression['helper']}")
+        return HELPER, expression["helper"]
+    if keys == {"all"}:
+        return ALL, tuple(parse_rule(child, helpers) for child in expression["all"])
+    if keys == {"any"}:
+        return ANY, tuple(parse_rule(child, helpers) for child in expression["any"])
+    if keys == {"switch", "cases", "default"}:
+        if expression["switch"] not in RuleSettings._fields:
+            raise ValueError(f"Unknown Minecraft rule setting {expression['switch']}")
+        return (SWITCH, expression["switch"],
+                {value: parse_rule(case, helpers) for value, case in expression["cases"].items()},
+                parse_rule(expression["default"], helpers))
+    if keys == {"structure_compass"}:
+        return COMPASS, expression["structure_compass"]
+    raise ValueError(f"Invalid Minecraft rule expression {expression!r}")
+
+
+def parse_rule_data(data: dict) -> Dict[str, Dict[str, Expression]]:
+    helpers = set(data["helpers"])
+    return {kind: {name: parse_rule(expression, helpers) for name, expression in data[kind].items()}
+            for kind in ("helpers", "entrances", "locations")}
+
+
+@lru_cache(maxsize=None)
+def get_rule_data() -> Dict[str, Dict[str, Expression]]:
+    # parsed on first use, so importing the world doesn't load the rule tables
+    return parse_rule_data(Constants.rule_info)
+
+
+def resolve_rule(expression: Expression, settings: RuleSettings, memoized: FrozenSet[str]) -> Expression:
+    """
+    Pick the cases for `settings`, inline every helper not in `memoized` and fold nested and constant
+    conjunctions and disjunctions, leaving an expression without SWITCH nodes.
+    """
+    kind = expression[0]
+    if kind == SWITCH:
+        _, setting, cases, default = expression
+        return resolve_rule(cases.get(getattr(settings, setting), default), settings, memoized)
+    if kind == HELPER:
+        if expression[1] in memoized:
+            return expression
+        return resolve_rule(get_rule_data()["helpers"][expression[1]], settings, memoized)
+    if kind == COMPASS:
+        return expression if settings.structure_compasses == "true" else (TRUE,)
+    if kind not in (ALL, ANY):
+        return expression
+
+    # TRUE ends a disjunction and is dropped from a conjunction, FALSE the other way around
+    absorbing, neutral = ((FALSE,), (TRUE,)) if kind == ALL else ((TRUE,), (FALSE,))
+    children = []
+    for child in expression[1]:
+        child = resolve_rule(child, settings, memoized)
+        if child == absorbing:
+            return absorbing
+        for part in (child[1] if child[0] == kind else (child,)):
+            if part != neutral and part not in children:
+                children.append(part)
+    if not children:
+        return neutral
+    if len(children) == 1:
+        return children[0]
+    return kind, tuple(children)
+
+
+def rule_source(expression: Expression) -> str:
+    kind = expression[0]
+    if kind == TRUE:
+        return "True"
+    if kind == FALSE:
+        return "False"
+    if kind == HAS:
+        _, item, count = expression
+        return f"state.has({item!r}, player)" if count == 1 else f"state.has({item!r}, player, {count})"
+    if kind == REGION:
+        return f"state.can_reach_region({expression[1]!r}, player)"
+    if kind == LOCATION:
+        return f"state.can_reach_location({expression[1]!r}, player)"
+    if kind == HELPER:
+        return f"helpers[{expression[1]!r}](world, state, player)"
+    if kind == COMPASS:
+        return f"state.has(compasses[{expression[1]!r}], player)"
+    separator = " and " if kind == ALL else " or "
+    return separator.join(f"({rule_source(child)})" if child[0] in (ALL, ANY) else rule_source(child)
+                          for child in expression[1])
+
+
+@lru_cache(maxsize=None)
+def rule_factory(source: str) -> Callable:
+    """Compile a rule's source into a function binding it to a world, player, memoized helpers and compasses."""
+    return eval(f"lambda world, player, helpers, compasses: lambda state: {source}", {"__builtins__": {}})
+
+
+@lru_cache(maxsize=None)
+def resolved_rule_sources(settings: RuleSettings, memoized: FrozenSet[str]) -> Dict[str, Dict[str, str]]:
+    return {kind: {name: rule_source(resolve_rule(expression, settings, memoized))
+                   for name, expression in get_rule_data()[kind].items()}
+            for kind in ("helpers", "entrances", "locations")}
+
+
+def count_reachable_advancements(state: CollectionState, player: int, advancements: List[Location],
+                                 affected_by: Optional[Dict[str, List[Location]]] = None) -> int:
+    """
+    Incremental equivalent of counting every advancement in `advancements` that `state` can reach.
+    Every rule only tests for the player's own items and regions, so collecting items can only make
+    advancements reachable and removing items can only make them unreachable. Only the side that can
+    have changed is re-checked, and with `affected_by` (item name -> advancements it can affect) only
+    the advancements affected by the items that changed.
+    """
+    reached = state.mc_reached_advancements[player]
+    dirty = state.mc_advancements_dirty[player]
+    if dirty:
+        changed = state.mc_changed_items[player]
+        if changed is None or affected_by is None:
+            candidates = advancements
+        else:
+            candidates = {location for item in changed for location in affected_by.get(item, ())}
+        if dirty & ADVANCEMENTS_LOST:
+            reached.difference_update([location for location in candidates
+                                       if location in reached and not location.can_reach(state)])
+        if dirty & ADVANCEMENTS_GAINED:
+            reached.update([location for location in candidates
+                            if location not in reached and location.can_reach(state)])
+        state.mc_advancements_dirty[player] = 0
+        state.mc_changed_items[player] = set()
+    return len(reached)
+
+
+def advancements_affected_by_items(world: "MinecraftWorld", requirements: dict,
+                                   advancements: List[Location]) -> Optional[Dict[str, List[Location]]]:
+    affected = locations_affected_by_items(world, build_dependency_index(requirements))
+    if affected is None:
+        return None
+    return {item: [location for location in advancements if location.name in names]
+            for item, names in affected.items()}
+
+
+def get_rule_settings(world) -> Tuple[RuleSettings, Dict[str, str]]:
+    """Return the settings the world's rules are resolved with, and the compass for each structure entrance."""
+    # Structures are already placed when rules are set, so where they ended up is resolved once here
+    structures = {entrance_name: world.entrances_by_name[entrance_name].connected_region.name
+                  for entrance_name, _ in Constants.region_info["default_connections"]}
+    settings = RuleSettings(
+        combat_difficulty=world.options.combat_difficulty.current_key,
+        death_link="true" if world.options.death_link else "false",
+        structure_compasses="true" if world.options.structure_compasses else "false",
+        village_dimension=world.regions_by_name['Village'].entrances[0].parent_region.name,
+    )
+    compasses = {entrance_name: f"Structure Compass ({structure})" for entrance_name, structure in structures.items()}
+    return settings, compasses
+
+
+def get_rules_lookup(world, player: int, helper_cache: Optional[HelperCache] = None):
+    settings, compasses = get_rule_settings(world)
+    memoized = MEMOIZED_HELPERS if helper_cache is not None else frozenset()
+    sources = resolved_rule_sources(settings, memoized)
+    helpers = {}
+    for name in memoized:
+        rule = rule_factory(sources["helpers"][name])(world, player, helpers, compasses)
+
+        def helper(world: "MinecraftWorld", state: CollectionState, player: int, rule=rule) -> bool:
+            return rule(state)
+
+        helper.__name__ = name
+        helpers[name] = helper_cache.memoize(helper)
+
+    return {kind: {name: rule_factory(source)(world, player, helpers, compasses)
+                   for name, source in sources[kind].items()}
+            for kind in ("entrances", "locations")}
+
+
+# (settings, compasses) -> requirements compiled from the plain rules. Requirements only name items, regions and
+# locations, never the player, so they're shared by every player whose rules resolve to the same sources.
+compiled_requirements: Dict[Tuple[RuleSettings, FrozenSet[Tuple[str, str]]],
+                            Dict[str, Dict[str, Optional[Requirements]]]] = {}
+
+
+def get_requirements(world: "MinecraftWorld", rules_lookup: dict) -> Dict[str, Dict[str, Optional[Requirements]]]:
+    """Return the requirements of `rules_lookup`, the world's plain rules, compiling them on first use."""
+    settings, compasses = get_rule_settings(world)
+    key = settings, frozenset(compasses.items())
+    if key not in compiled_requirements:
+        compiled_requirements[key] = compile_requirements(world, rules_lookup)
+    return compiled_requirements[key]
 
 
 def set_rules(self: "MinecraftWorld") -> None:
     multiworld = self.multiworld
     player = self.player
 
+    backend = rule_backend(self.settings.rule_backend)
+    helper_cache_size = self.settings.helper_cache_size
+
+    # Requirements are always compiled from the plain rules. Memoized helpers key their results on the player's
+    # item counts, which the compiler's probe state can't provide, so every rule using one would compile to
+    # unknown dependencies. Building the memoized lookup as well is cheap, since the rule sources are shared.
     rules_lookup = get_rules_lookup(self, player)
+    requirements = get_requirements(self, rules_lookup)
+    if backend == "compiled":
+        if helper_cache_size > 0 and player == min(multiworld.get_game_players(self.game)):
+            logging.warning("Minecraft helper_cache_size is ignored, the compiled rule backend has no helpers to cache")
+        rules_lookup = requirements_lookup(self, rules_lookup, requirements)
+    elif helper_cache_size > 0:
+        self.helper_cache = HelperCache(player, helper_cache_size)
+        rules_lookup = get_rules_lookup(self, player, self.helper_cache)
+    if profile_format(self.settings.rule_profile):
+        self.rule_profiler = RuleProfiler()
+        rules_lookup = self.rule_profiler.wrap_lookup(rules_lookup)
 
     # Set entrance rules
     for entrance_name, rule in rules_lookup["entrances"].items():
-        multiworld.get_entrance(entrance_name, player).access_rule = rule
+        self.entrances_by_name[entrance_name].access_rule = rule
 
     # Set location rules
     for location_name, rule in rules_lookup["locations"].items():
-        multiworld.get_location(location_name, player).access_rule = rule
+        self.locations_by_name[location_name].access_rule = rule
 
     # Set rules surrounding completion
     bosses = self.options.required_bosses
@@ -483,10 +390,11 @@ def set_rules(self: "MinecraftWorld") -> None:
     if bosses.wither:
         postgame_advancements.update(Constants.exclusion_info["wither"])
 
+    advancements = [location for location in self.locations_by_name.values() if location.address is not None]
+    affected_by = advancements_affected_by_items(self, requirements, advancements)
+
     def location_count(state: CollectionState) -> int:
-        return len([location for location in multiworld.get_locations(player) if
-                    location.address is not None and
-                    location.can_reach(state)])
+        return count_reachable_advancements(state, player, advancements, affected_by)
 
     def defeated_bosses(state: CollectionState) -> bool:
         return ((not bosses.dragon or state.has("Ender Dragon", player))
@@ -496,6 +404,9 @@ def set_rules(self: "MinecraftWorld") -> None:
     completion_requirements = lambda state: (location_count(state) >= self.options.advancement_goal
                                              and state.has("Dragon Egg Shard", player, egg_shards))
     multiworld.completion_condition[player] = lambda state: completion_requirements(state) and defeated_bosses(state)
+    if self.rule_profiler is not None:
+        multiworld.completion_condition[player] = self.rule_profiler.wrap(("completion", "completion_condition"),
+                                                                          multiworld.completion_condition[player])
 
     # Set exclusions on hard/unreasonable/postgame
     excluded_advancements = set()
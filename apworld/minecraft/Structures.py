@@ -1,9 +1,53 @@
+from functools import lru_cache
+
 from . import Constants
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Tuple
 if TYPE_CHECKING:
     from . import MinecraftWorld
 
 
+def valid_assignments(exits: List[str], structs: List[str],
+                      illegal_connections: Dict[str, List[str]]) -> List[Dict[str, str]]:
+    """
+    Every way of connecting each exit to a different structure without using an illegal connection,
+    found by backtracking over the exits in order.
+    """
+    assignments = []
+    pairs = {}
+
+    def place(index: int, remaining: List[str]) -> None:
+        if index == len(exits):
+            assignments.append(dict(pairs))
+            return
+        exit = exits[index]
+        for struct in remaining:
+            if exit not in illegal_connections.get(struct, []):
+                pairs[exit] = struct
+                place(index + 1, [s for s in remaining if s != struct])
+        pairs.pop(exit, None)
+
+    place(0, structs)
+    return assignments
+
+
+# A layout connects every structure exit, as (exit, structure) pairs in the order of default_connections
+Layout = Tuple[Tuple[str, str], ...]
+
+
+@lru_cache(maxsize=None)
+def structure_layouts(fixed_pairs: FrozenSet[Tuple[str, str]] = frozenset()) -> Tuple[Layout, ...]:
+    """
+    Every valid layout that includes `fixed_pairs`, such as the pairs set by plando.
+    The full table is listed once per process and the subset for each distinct set of fixed pairs is cached too.
+    """
+    if fixed_pairs:
+        return tuple(layout for layout in structure_layouts() if fixed_pairs.issubset(layout))
+    exits = [exit for exit, _ in Constants.region_info["default_connections"]]
+    structs = [struct for _, struct in Constants.region_info["default_connections"]]
+    return tuple(tuple((exit, pairs[exit]) for exit in exits)
+                 for pairs in valid_assignments(exits, structs, Constants.region_info["illegal_connections"]))
+
+
 def shuffle_structures(self: "MinecraftWorld") -> None:
     multiworld = self.multiworld
     player = self.player
@@ -13,8 +57,9 @@ def shuffle_structures(self: "MinecraftWorld") -> None:
 
     # Get all unpaired exits and all regions without entrances (except the Menu)
     # This function is destructive on these lists. 
-    exits = [exit.name for r in multiworld.regions if r.player == player for exit in r.exits if exit.connected_region is None]
-    structs = [r.name for r in multiworld.regions if r.player == player and r.entrances == [] and r.name != 'Menu']
+    regions = self.regions_by_name.values()
+    exits = [exit.name for r in regions for exit in r.exits if exit.connected_region is None]
+    structs = [r.name for r in regions if r.entrances == [] and r.name != 'Menu']
     exits_spoiler = exits[:] # copy the original order for the spoiler log
 
     pairs = {}
@@ -32,16 +77,15 @@ def shuffle_structures(self: "MinecraftWorld") -> None:
         for conn in self.options.plando_connections:
             set_pair(conn.entrance, conn.exit)
 
-    # The algorithm tries to place the most restrictive structures first. This algorithm always works on the
-    # relatively small set of restrictions here, but does not work on all possible inputs with valid configurations. 
+    # Pick uniformly among every valid layout that keeps the plando pairs
     if self.options.shuffle_structures:
-        structs.sort(reverse=True, key=lambda s: len(illegal_connections.get(s, [])))
-        for struct in structs[:]: 
-            try: 
-                exit = self.random.choice([e for e in exits if e not in illegal_connections.get(struct, [])])
-            except IndexError: 
-                raise Exception(f"No valid structure placements remaining for player {player} ({self.player_name})")
-            set_pair(exit, struct)
+        layouts = structure_layouts(frozenset(pairs.items()))
+        self.valid_structure_layouts = len(layouts)
+        if not layouts:
+            raise Exception(f"No valid structure placements remaining for player {player} ({self.player_name})")
+        for exit, struct in layouts[self.random.randrange(len(layouts))]:
+            if exit not in pairs:
+                set_pair(exit, struct)
     else: # write remaining default connections
         for (exit, struct) in default_connections: 
             if exit in exits: 
@@ -54,6 +98,6 @@ def shuffle_structures(self: "MinecraftWorld") -> None:
         raise Exception(f"Failed to connect all Minecraft structures for player {player} ({self.player_name})")
 
     for exit in exits_spoiler:
-        multiworld.get_entrance(exit, player).connect(multiworld.get_region(pairs[exit], player))
+        self.entrances_by_name[exit].connect(self.regions_by_name[pairs[exit]])
         if self.options.shuffle_structures or self.options.plando_connections:
             multiworld.spoiler.set_entrance(exit, pairs[exit], 'entrance', player)
@@ -1,26 +1,41 @@
 import os
 import json
+import atexit
+import logging
 import settings
 import typing
-import hashlib
 from base64 import b64encode, b64decode
 from typing import Dict, Any
 
-from BaseClasses import Region, Entrance, Item, Tutorial, ItemClassification, Location
+import Utils
+from BaseClasses import Region, Entrance, Item, Tutorial, ItemClassification, Location, CollectionState
 from worlds.AutoWorld import World, WebWorld
+from worlds.LauncherComponents import Component, SuffixIdentifier, Type, components
 
 from . import Constants
-from .MinecraftClient import add_to_launcher_components
 from .Options import MinecraftOptions
 from .Structures import shuffle_structures
-from .ItemPool import build_item_pool, get_junk_item_names
-from .Rules import set_rules
+from .ItemPool import build_item_pool, get_junk_item_name
+from .Rules import set_rules, mark_advancements_dirty, HelperCache, ADVANCEMENTS_GAINED, ADVANCEMENTS_LOST
+from .RuleProfiler import RuleProfiler, profile_format
 from .MinecraftPatch import MinecraftProcedurePatch
 
 client_version = 9
 
 
-add_to_launcher_components()
+def launch_client(*args):
+    # The client imports tkinter, requests and the rest of its dependencies, so only load it when it's launched
+    from .MinecraftClient import run_client_threaded
+    run_client_threaded(*args)
+
+
+components.append(Component(
+    "Minecraft Client",
+    func=launch_client,
+    component_type=Type.CLIENT,
+    file_identifier=SuffixIdentifier(".apmc"),
+    cli=True
+))
 
 class MinecraftSettings(settings.Group):
     class ForgeDirectory(settings.OptionalUserFolderPath):
@@ -46,11 +61,34 @@ class MinecraftSettings(settings.Group):
         """
         pass
 
+    class RuleBackend(str):
+        """
+        How access rules are evaluated during generation, "lambda" or "compiled".
+        "compiled" turns every rule into item count thresholds and region checks once, before filling.
+        """
+
+    class HelperCacheSize(int):
+        """
+        Number of rule helper results to cache per Minecraft player during generation, 0 to disable.
+        Only used by the "lambda" rule backend. Hit rates are logged when the generating process exits, so they
+        cover every evaluation, including the accessibility check and playthrough.
+        """
+
+    class RuleProfile(str):
+        """
+        Report format for profiling every access rule during generation, "json", "csv", or "" to disable.
+        The MC_RULE_PROFILE environment variable overrides this. Reports are written to the output folder when
+        the generating process exits, so they cover every evaluation, including the playthrough.
+        """
+
     forge_directory: ForgeDirectory = ForgeDirectory("Minecraft Forge server")
     max_heap_size: str = "2G"
     release_channel: ReleaseChannel = ReleaseChannel("release")
     mc_launch: MCLaunch = MCLaunch("")
     java: JavaPath = JavaPath("")
+    rule_backend: RuleBackend = RuleBackend("lambda")
+    helper_cache_size: HelperCacheSize = HelperCacheSize(0)
+    rule_profile: RuleProfile = RuleProfile("")
 
 
 class MinecraftWebWorld(WebWorld):
@@ -114,8 +152,22 @@ class MinecraftWorld(World):
     topology_present = True
     web = MinecraftWebWorld()
 
-    item_name_to_id = Constants.item_name_to_id
-    location_name_to_id = Constants.location_name_to_id
+    # Plain copies of the read-only maps in Constants, since Archipelago serialises them into the datapackage
+    item_name_to_id = dict(Constants.item_name_to_id)
+    location_name_to_id = dict(Constants.location_name_to_id)
+
+    # This player's regions, entrances and locations by name, filled by create_regions.
+    # Looking them up here doesn't go through the multiworld's caches, which grow with every slot.
+    regions_by_name: Dict[str, Region]
+    entrances_by_name: Dict[str, Entrance]
+    locations_by_name: Dict[str, Location]
+
+    # number of structure layouts the shuffle drew from, 0 when structures weren't shuffled
+    valid_structure_layouts: int = 0
+
+    helper_cache: typing.Optional[HelperCache] = None
+    rule_profiler: typing.Optional[RuleProfiler] = None
+    _slot_data: typing.Optional[dict] = None
 
     def _get_mc_data(self) -> dict:
         """
@@ -134,7 +186,7 @@ class MinecraftWorld(World):
             "player_id": self.player,
             "client_version": client_version,
             "structures": {
-                exit_name: self.multiworld.get_entrance(exit_name, self.player).connected_region.name
+                exit_name: self.entrances_by_name[exit_name].connected_region.name
                 for exit_name in exits
             },
             "advancement_goal": self.options.advancement_goal.value,
@@ -157,22 +209,25 @@ class MinecraftWorld(World):
 
         return data
 
-    def create_item(self, name: str) -> Item:
-        item_class = ItemClassification.filler
-        if name in Constants.item_info["progression_items"]:
-            item_class = ItemClassification.progression
-        elif name in Constants.item_info["useful_items"]:
-            item_class = ItemClassification.useful
-        elif name in Constants.item_info["trap_items"]:
-            item_class = ItemClassification.trap
+    def get_slot_data(self) -> dict:
+        """
+        Return this player's world data, computed once and shared by the patch and fill_slot_data
+        so the two always agree. Callers must not modify it.
+        """
+        if self._slot_data is None:
+            self._slot_data = self._get_mc_data()
+        return self._slot_data
 
-        return MinecraftItem(name, item_class, self.item_name_to_id.get(name, None), self.player)
+    def create_item(self, name: str) -> Item:
+        item_class, item_id = Constants.item_table.get(name, (ItemClassification.filler, None))
+        return MinecraftItem(name, item_class, item_id, self.player)
 
     def create_event(self, region_name: str, event_name: str) -> None:
-        region = self.multiworld.get_region(region_name, self.player)
+        region = self.regions_by_name[region_name]
         loc = MinecraftLocation(self.player, event_name, None, region)
         loc.place_locked_item(self.create_event_item(event_name))
         region.locations.append(loc)
+        self.locations_by_name[event_name] = loc
 
     def create_event_item(self, name: str) -> Item:
         item = self.create_item(name)
@@ -180,32 +235,44 @@ class MinecraftWorld(World):
         return item
 
     def create_regions(self) -> None:
-        # Create regions
-        for region_name, exits in Constants.region_info["regions"]:
-            r = Region(region_name, self.player, self.multiworld)
-            for exit_name in exits:
-                r.exits.append(Entrance(self.player, exit_name, r))
-            self.multiworld.regions.append(r)
+        player = self.player
+        multiworld = self.multiworld
+        regions_by_name = self.regions_by_name = {}
+        entrances_by_name = self.entrances_by_name = {}
+        locations_by_name = self.locations_by_name = {}
+
+        # Create regions from the graph prebuilt in Constants
+        for region_name, exit_names in Constants.region_template:
+            r = Region(region_name, player, multiworld)
+            exits = [Entrance(player, exit_name, r) for exit_name in exit_names]
+            r.exits.extend(exits)
+            entrances_by_name.update(zip(exit_names, exits))
+            multiworld.regions.append(r)
+            regions_by_name[region_name] = r
 
         # Bind mandatory connections
-        for entr_name, region_name in Constants.region_info["mandatory_connections"]:
-            e = self.multiworld.get_entrance(entr_name, self.player)
-            r = self.multiworld.get_region(region_name, self.player)
-            e.connect(r)
+        for entr_name, region_name in Constants.connection_template:
+            entrances_by_name[entr_name].connect(regions_by_name[region_name])
 
         # Add locations
-        for region_name, locations in Constants.location_info["locations_by_region"].items():
-            region = self.multiworld.get_region(region_name, self.player)
-            for loc_name in locations:
-                loc = MinecraftLocation(self.player, loc_name,
-                    self.location_name_to_id.get(loc_name, None), region)
-                region.locations.append(loc)
+        for region_name, locations in Constants.location_template:
+            region = regions_by_name[region_name]
+            region_locations = [MinecraftLocation(player, loc_name, address, region) for loc_name, address in locations]
+            region.locations.extend(region_locations)
+            locations_by_name.update((loc.name, loc) for loc in region_locations)
 
         # Add events
         self.create_event("Nether Fortress", "Blaze Rods")
         self.create_event("The End", "Ender Dragon")
         self.create_event("Nether Fortress", "Wither")
 
+        # Add capability events, shared conditions of many rules which a sweep collects once
+        self.create_event("Overworld", "Iron Ingots")
+        self.create_event("Overworld", "Potion Brewing")
+        self.create_event("Overworld", "Enchanting Table")
+        self.create_event("Overworld", "Adventuring")
+        self.create_event("Overworld", "Basic Combat")
+
         # Shuffle the connections
         shuffle_structures(self)
 
@@ -214,6 +281,36 @@ class MinecraftWorld(World):
 
     set_rules = set_rules
 
+    def collect(self, state: CollectionState, item: Item) -> bool:
+        change = super().collect(state, item)
+        if change:
+            mark_advancements_dirty(state, self.player, item.name, ADVANCEMENTS_GAINED)
+        return change
+
+    def remove(self, state: CollectionState, item: Item) -> bool:
+        change = super().remove(state, item)
+        if change:
+            mark_advancements_dirty(state, self.player, item.name, ADVANCEMENTS_LOST)
+        return change
+
+    def write_spoiler_header(self, spoiler_handle: typing.TextIO) -> None:
+        if self.valid_structure_layouts:
+            spoiler_handle.write(f"Valid structure layouts:         {self.valid_structure_layouts}\n")
+
+    def post_fill(self) -> None:
+        # Settle the slot data before output, where generate_output and fill_slot_data may run concurrently
+        self.get_slot_data()
+
+        if self.helper_cache is not None:
+            # Logged when the process exits, like the rule profile, since the accessibility check and playthrough
+            # still evaluate rules after fill
+            atexit.register(self.log_helper_cache_stats)
+
+    def log_helper_cache_stats(self) -> None:
+        for name, (evaluations, hit_rate) in self.helper_cache.stats().items():
+            logging.info(f"Minecraft helper cache for {self.player_name}: {name} evaluated {evaluations} times, "
+                         f"{hit_rate:.1%} hits")
+
     def generate_output(self, output_directory: str) -> None:
         """
         Generates a Minecraft patch file (.apmc) for this player and writes it
@@ -226,8 +323,7 @@ class MinecraftWorld(World):
         )
 
         # Store Minecraft world data
-        patch.data = self._get_mc_data()
-        patch.hash = hashlib.sha1(json.dumps(patch.data).encode()).hexdigest()
+        patch.set_data(self.get_slot_data())
 
         # Explicitly set patch name and file ending
         patch.patch_name = f"AP_{self.multiworld.seed_name}_P{self.player}_{self.multiworld.get_player_name(self.player)}"
@@ -237,23 +333,34 @@ class MinecraftWorld(World):
         patch_path = os.path.join(output_directory, patch.patch_name + patch.patch_file_ending)
         patch.write(patch_path)
 
+        if self.rule_profiler is not None:
+            # Written when the process exits, so the report also covers the accessibility check and playthrough,
+            # which run during and after output. By then output_directory, a temporary directory, is gone, so
+            # the report goes to the output folder next to the seed's zip.
+            file_format = profile_format(self.settings.rule_profile)
+            atexit.register(self.rule_profiler.write,
+                            Utils.output_path(f"{patch.patch_name}_rules.{file_format}"), file_format)
+
         # ---- Server fields commented out ----
         # If in the future to get local auto-join, it'd be something like:
         # patch.server = "127.0.0.1"
         # patch.port = 25565r
 
     def fill_slot_data(self) -> dict:
-        return self._get_mc_data()
+        return self.get_slot_data()
 
     def get_filler_item_name(self) -> str:
-        return get_junk_item_names(self.random, 1)[0]
+        return get_junk_item_name(self.random)
 
 
 class MinecraftLocation(Location):
     game = "Minecraft"
 
+# Item is slotted in Archipelago, so with empty slots items carry no instance __dict__.
+# Location has no slots, so its instances keep one either way.
 class MinecraftItem(Item):
     game = "Minecraft"
+    __slots__ = ()
 
 
 def mc_update_output(data: dict, server: str, port: int) -> dict:
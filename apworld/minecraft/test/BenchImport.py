@@ -0,0 +1,44 @@
+"""
+Measures the import time of the Minecraft and Minecraft Dig worlds with `python -X importtime`, and what
+their launcher clients would add if they were imported with the world rather than when they're launched.
+Not collected as a test; run it from an Archipelago checkout with `python -m worlds.minecraft.test.BenchImport`.
+"""
+import subprocess
+import sys
+from typing import Dict
+
+WORLDS = (
+    ("worlds.minecraft", "worlds.minecraft.MinecraftClient"),
+    ("worlds.minecraft_dig", "worlds.minecraft_dig.MinecraftDigClient"),
+)
+REPEATS = 5
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Import `module` in a fresh interpreter and return the cumulative import time in us of every module loaded."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def best_time(module: str, target: str) -> int:
+    return min(import_times(module).get(target, 0) for _ in range(REPEATS))
+
+
+if __name__ == "__main__":
+    # importing a client module imports its world first, so its cumulative time is what loading it adds
+    print(f"{'world':<22} {'world ms':>9} {'client ms':>10}  client loaded with the world")
+    for world, client in WORLDS:
+        try:
+            world_times = import_times(world)
+        except subprocess.CalledProcessError:
+            print(f"{world:<22} not installed")
+            continue
+        print(f"{world:<22} {best_time(world, world) / 1000:>9.1f} {best_time(client, client) / 1000:>10.1f}  "
+              f"{'yes' if client in world_times else 'no'}")
@@ -0,0 +1,56 @@
+"""
+Reports the memory one Minecraft slot's items and locations take. Items are measured with the slotted class
+and with an equivalent that carries an instance __dict__ like the class did before. Locations are reported on
+their own for scale: Archipelago's Location has no slots, so MinecraftLocation keeps its __dict__.
+Not collected as a test; run it from an Archipelago checkout with `python -m worlds.minecraft.test.BenchMemory`.
+"""
+import tracemalloc
+from typing import Callable
+
+from BaseClasses import MultiWorld, Region
+from .. import Constants, MinecraftItem, MinecraftLocation
+
+SLOTS = 100
+
+
+class DictItem(MinecraftItem):
+    pass
+
+
+def per_slot(create: Callable[[int, Region], list]) -> float:
+    """Bytes allocated per slot for the objects `create` makes for a player."""
+    multiworld = MultiWorld(SLOTS)
+    regions = [Region("Menu", player, multiworld) for player in multiworld.player_ids]
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    objects = [create(region.player, region) for region in regions]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return (end - start) / SLOTS
+
+
+def create_locations(player: int, region: Region) -> list:
+    return [MinecraftLocation(player, name, address, region)
+            for _, locations in Constants.location_template for name, address in locations]
+
+
+def create_items(item_class) -> Callable[[int, Region], list]:
+    """A pool of as many items as a slot has locations, cycling through the item table."""
+    item_names = list(Constants.item_table.items())
+    location_count = sum(len(locations) for _, locations in Constants.location_template)
+
+    def create(player: int, region: Region) -> list:
+        return [item_class(name, classification, code, player)
+                for name, (classification, code) in (item_names[index % len(item_names)]
+                                                     for index in range(location_count))]
+
+    return create
+
+
+if __name__ == "__main__":
+    before = per_slot(create_items(DictItem))
+    after = per_slot(create_items(MinecraftItem))
+    print(f"items with __dict__: {before / 1024:.1f} KiB per slot")
+    print(f"items slotted:       {after / 1024:.1f} KiB per slot ({1 - after / before:.0%} less)")
+    print(f"locations:           {per_slot(create_locations) / 1024:.1f} KiB per slot (unchanged)")
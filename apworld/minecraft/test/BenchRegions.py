@@ -0,0 +1,36 @@
+"""
+Times MinecraftWorld.create_regions for a growing number of Minecraft slots.
+Not collected as a test; run it from an Archipelago checkout with `python -m worlds.minecraft.test.BenchRegions`.
+"""
+import time
+
+from BaseClasses import MultiWorld
+from .. import MinecraftWorld, MinecraftOptions
+
+SLOT_COUNTS = (1, 10, 100, 1000)
+REPEATS = 3
+
+
+def bench_create_regions(slots: int) -> float:
+    multiworld = MultiWorld(slots)
+    multiworld.game = {player: MinecraftWorld.game for player in multiworld.player_ids}
+    multiworld.player_name = {player: f"Player{player}" for player in multiworld.player_ids}
+    multiworld.set_seed(0)
+    worlds = [MinecraftWorld(multiworld, player) for player in multiworld.player_ids]
+    for world in worlds:
+        # default options, built like MultiWorld.set_options does
+        world.options = MinecraftOptions(**{name: option.from_any(option.default)
+                                            for name, option in MinecraftOptions.type_hints.items()})
+        multiworld.worlds[world.player] = world
+
+    start = time.perf_counter()
+    for world in worlds:
+        world.create_regions()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{'slots':>6} {'total ms':>10} {'per slot ms':>12}")
+    for slots in SLOT_COUNTS:
+        seconds = min(bench_create_regions(slots) for _ in range(REPEATS))
+        print(f"{slots:>6} {seconds * 1000:>10.2f} {seconds * 1000 / slots:>12.3f}")
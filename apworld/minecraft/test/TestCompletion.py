@@ -0,0 +1,53 @@
+from BaseClasses import CollectionState
+
+from . import MCTestBase
+from ..Rules import count_reachable_advancements, advancements_affected_by_items, get_rules_lookup
+from ..RuleCompiler import compile_requirements
+
+
+class TestAdvancementCount(MCTestBase):
+    options = {
+        "shuffle_structures": False,
+        "structure_compasses": False
+    }
+
+    def full_scan(self, state):
+        return len([location for location in self.multiworld.get_locations(self.player)
+                    if location.address is not None and location.can_reach(state)])
+
+    def check_count(self, affected_by=None):
+        advancements = [location for location in self.multiworld.get_locations(self.player)
+                        if location.address is not None]
+        if affected_by is not None:
+            affected_by = affected_by(advancements)
+        state = self.multiworld.state.copy()
+        assert count_reachable_advancements(state, self.player, advancements, affected_by) == self.full_scan(state)
+
+        items = [item for item in self.multiworld.itempool if item.advancement]
+        for item in items:
+            state.collect(item, True)
+            assert count_reachable_advancements(state, self.player, advancements, affected_by) == self.full_scan(state)
+
+        copied = state.copy()
+        assert count_reachable_advancements(copied, self.player, advancements, affected_by) == self.full_scan(copied)
+
+        for item in reversed(items):
+            state.remove(item)
+            assert count_reachable_advancements(state, self.player, advancements, affected_by) == self.full_scan(state)
+
+    def test_count_matches_full_scan(self):
+        self.check_count()
+
+    def test_targeted_count_matches_full_scan(self):
+        world = self.multiworld.worlds[self.player]
+        requirements = compile_requirements(world, get_rules_lookup(world, self.player))
+        self.check_count(lambda advancements: advancements_affected_by_items(world, requirements, advancements))
+
+    def test_collect_item_link_group_item(self):
+        group_id, _ = self.multiworld.add_group("Minecraft Link", self.game, frozenset({self.player}))
+        state = CollectionState(self.multiworld)
+        item = self.multiworld.worlds[group_id].create_item("Progressive Tools")
+        state.collect(item, True)
+        assert state.has("Progressive Tools", group_id)
+        state.remove(item)
+        assert not state.has("Progressive Tools", group_id)
@@ -58,3 +58,67 @@ class TestDataLoad(unittest.TestCase):
             assert k in all_regions
             assert set(v) <= all_entrances
 
+    def test_rule_data(self):
+        rule_info = Constants.rule_info
+        region_info = Constants.region_info
+        events = {"Blaze Rods", "Ender Dragon", "Wither", "Iron Ingots", "Potion Brewing", "Enchanting Table",
+                  "Adventuring", "Basic Combat"}
+
+        all_items = set(Constants.item_info['all_items']) | events
+        all_locations = set(Constants.location_info['all_locations']) | events
+        all_regions = {v[0] for v in region_info['regions']}
+        all_entrances = {entrance for v in region_info['regions'] for entrance in v[1]}
+        structure_entrances = {v[0] for v in region_info['default_connections']}
+
+        # Every rule belongs to a real entrance or location
+        assert set(rule_info['entrances'].keys()) <= all_entrances
+        assert set(rule_info['locations'].keys()) <= all_locations
+
+        # Every item, region, location, helper and structure entrance a rule refers to exists
+        def check(expression):
+            if isinstance(expression, bool):
+                return
+            assert isinstance(expression, dict)
+            if "has" in expression:
+                assert expression["has"] in all_items, expression
+            if "region" in expression:
+                assert expression["region"] in all_regions, expression
+            if "location" in expression:
+                assert expression["location"] in all_locations, expression
+            if "helper" in expression:
+                assert expression["helper"] in rule_info['helpers'], expression
+            if "structure_compass" in expression:
+                assert expression["structure_compass"] in structure_entrances, expression
+            for child in expression.get("all", []) + expression.get("any", []):
+                check(child)
+            if "switch" in expression:
+                for case in expression["cases"].values():
+                    check(case)
+                check(expression["default"])
+
+        for kind in ('helpers', 'entrances', 'locations'):
+            for expression in rule_info[kind].values():
+                check(expression)
+
+    def test_index_data(self):
+        # The index loaded at import agrees with the full tables loaded on first access
+        tables = Constants.load_data_tables()
+        assert Constants.default_connections == tables['region_info']['default_connections']
+        assert Constants.illegal_connections == tables['region_info']['illegal_connections']
+        assert list(Constants.location_name_to_id) == tables['location_info']['all_locations']
+        assert set(tables['item_info']['all_items']) <= set(Constants.item_name_to_id)
+        with self.assertRaises(AttributeError):
+            Constants.not_a_table
+
+    def test_id_tables(self):
+        # The dense id tables agree with the name maps, and ids outside them have no name
+        for name, item_id in Constants.item_name_to_id.items():
+            assert Constants.get_item_name(item_id) == name
+            assert Constants.get_item_classification(item_id) == Constants.item_table[name][0]
+        for name, location_id in Constants.location_name_to_id.items():
+            assert Constants.get_location_name(location_id) == name
+        assert Constants.get_item_name(Constants.item_id_offset - 1) is None
+        assert Constants.get_item_name(Constants.item_id_offset + len(Constants.item_id_to_name)) is None
+        assert Constants.get_location_name(Constants.location_id_offset - 1) is None
+        with self.assertRaises(TypeError):
+            Constants.item_name_to_id["Not an Item"] = 0
@@ -0,0 +1,34 @@
+from . import MCTestBase
+from ..Rules import HelperCache, get_rules_lookup, rule_backend
+
+
+class TestHelperCache(MCTestBase):
+    options = {
+        "shuffle_structures": False,
+        "structure_compasses": True
+    }
+
+    def test_memoized_rules_agree(self):
+        world = self.multiworld.worlds[self.player]
+        cache = HelperCache(self.player, 16)
+        rules_lookup = get_rules_lookup(world, self.player)
+        memoized_lookup = get_rules_lookup(world, self.player, cache)
+
+        items = [item for item in self.multiworld.itempool if item.advancement]
+        states = [self.get_state(items[:count]) for count in range(0, len(items), 5)]
+        for _ in range(2):
+            for state in states:
+                for kind, rules in rules_lookup.items():
+                    for name, rule in rules.items():
+                        self.assertEqual(bool(rule(state)), bool(memoized_lookup[kind][name](state)), name)
+
+        stats = cache.stats()
+        assert stats
+        assert all(0 <= hit_rate <= 1 for _, hit_rate in stats.values())
+        assert len(cache.results) <= 16
+
+    def test_rule_backend_setting(self):
+        self.assertEqual(rule_backend("lambda"), "lambda")
+        self.assertEqual(rule_backend(" Compiled "), "compiled")
+        with self.assertRaises(ValueError):
+            rule_backend("compield")
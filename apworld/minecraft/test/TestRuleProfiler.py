@@ -0,0 +1,40 @@
+import os
+from unittest import mock
+
+from . import MCTestBase
+from ..Rules import get_rules_lookup
+from ..RuleProfiler import RuleProfiler, profile_format, PROFILE_ENVIRONMENT_VARIABLE
+
+
+class TestRuleProfiler(MCTestBase):
+    options = {
+        "shuffle_structures": False,
+        "structure_compasses": False
+    }
+
+    def test_profiled_rules_agree(self):
+        world = self.multiworld.worlds[self.player]
+        profiler = RuleProfiler()
+        rules_lookup = get_rules_lookup(world, self.player)
+        profiled_lookup = profiler.wrap_lookup(rules_lookup)
+
+        state = self.multiworld.state.copy()
+        for kind, rules in rules_lookup.items():
+            for name, rule in rules.items():
+                self.assertEqual(rule(state), profiled_lookup[kind][name](state), name)
+
+        report = profiler.report()
+        self.assertEqual(len(report), sum(len(rules) for rules in rules_lookup.values()))
+        for row in report:
+            self.assertEqual(row["calls"], 1)
+            self.assertEqual(row["true"] + row["false"], 1)
+        self.assertEqual(report, sorted(report, key=lambda row: -row["seconds"]))
+
+    def test_profile_format(self):
+        with mock.patch.dict(os.environ, {PROFILE_ENVIRONMENT_VARIABLE: ""}):
+            self.assertIsNone(profile_format(""))
+            self.assertEqual(profile_format("csv"), "csv")
+        with mock.patch.dict(os.environ, {PROFILE_ENVIRONMENT_VARIABLE: "JSON"}):
+            self.assertEqual(profile_format(""), "json")
+        with mock.patch.dict(os.environ, {PROFILE_ENVIRONMENT_VARIABLE: "xml"}):
+            self.assertRaises(ValueError, profile_format, "")
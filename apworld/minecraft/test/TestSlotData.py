@@ -0,0 +1,17 @@
+from . import MCTestBase
+
+
+class TestSlotData(MCTestBase):
+    options = {
+        "shuffle_structures": True
+    }
+
+    def test_slot_data_computed_once(self):
+        world = self.multiworld.worlds[self.player]
+        slot_data = world.fill_slot_data()
+        self.assertIs(slot_data, world.fill_slot_data())
+        self.assertIs(slot_data, world.get_slot_data())
+        self.assertEqual(slot_data["structures"],
+                         {exit_name: entrance.connected_region.name
+                          for exit_name, entrance in world.entrances_by_name.items()
+                          if exit_name in slot_data["structures"]})
@@ -0,0 +1,39 @@
+import unittest
+
+from .. import Constants
+from ..Structures import valid_assignments, structure_layouts
+
+
+class TestStructureAssignments(unittest.TestCase):
+    exits = [exit for exit, _ in Constants.region_info["default_connections"]]
+    structs = [struct for _, struct in Constants.region_info["default_connections"]]
+    illegal_connections = Constants.region_info["illegal_connections"]
+
+    def test_all_assignments_valid(self):
+        assignments = valid_assignments(self.exits, self.structs, self.illegal_connections)
+        # 5! layouts, less the 4! with the Nether Fortress in the End
+        self.assertEqual(len(assignments), 96)
+        self.assertEqual(len({tuple(sorted(pairs.items())) for pairs in assignments}), 96)
+        for pairs in assignments:
+            self.assertEqual(set(pairs.keys()), set(self.exits))
+            self.assertEqual(set(pairs.values()), set(self.structs))
+            for exit, struct in pairs.items():
+                self.assertNotIn(exit, self.illegal_connections.get(struct, []))
+
+    def test_no_assignments(self):
+        # the only exit left can't take the only structure left
+        self.assertEqual(valid_assignments(["The End Structure"], ["Nether Fortress"], self.illegal_connections), [])
+
+    def test_layout_table(self):
+        layouts = structure_layouts()
+        self.assertEqual(len(layouts), 96)
+        self.assertIs(layouts, structure_layouts())
+        for layout in layouts:
+            self.assertEqual([exit for exit, _ in layout], self.exits)
+
+        fixed = frozenset({("The End Structure", "Village")})
+        plando_layouts = structure_layouts(fixed)
+        self.assertEqual(len(plando_layouts), 24)
+        for layout in plando_layouts:
+            self.assertIn(("The End Structure", "Village"), layout)
+        self.assertEqual(structure_layouts(frozenset({("The End Structure", "Nether Fortress")})), ())
@@ -1,5 +1,7 @@
 from test.bases import TestBase, WorldTestBase
 from .. import MinecraftWorld, MinecraftOptions
+from ..Rules import get_rules_lookup
+from ..RuleCompiler import compile_rules_lookup
 
 
 class MCTestBase(WorldTestBase, TestBase):
@@ -16,6 +18,19 @@ class MCTestBase(WorldTestBase, TestBase):
             return ret[0]
         return ret
 
+    def assert_compiled_rules_agree(self, state):
+        # every state the rule tables build also checks the compiled backend against the lambdas
+        world = self.multiworld.worlds[self.player]
+        if getattr(self, "_compiled_for", None) is not self.multiworld:
+            self._rules_lookup = get_rules_lookup(world, self.player)
+            self._compiled_lookup = compile_rules_lookup(world, self._rules_lookup)
+            self._compiled_for = self.multiworld
+        for kind, rules in self._rules_lookup.items():
+            for name, rule in rules.items():
+                self.assertEqual(bool(rule(state)), bool(self._compiled_lookup[kind][name](state)),
+                                 f"Compiled rule for {name} disagrees")
+        return state
+
     def _get_items(self, item_pool, all_except):
         if all_except and len(all_except) > 0:
             items = self.multiworld.itempool[:]
@@ -23,11 +38,11 @@ class MCTestBase(WorldTestBase, TestBase):
             items.extend(self._create_items(item_pool[0], 1))
         else:
             items = self._create_items(item_pool[0], 1)
-        return self.get_state(items)
+        return self.assert_compiled_rules_agree(self.get_state(items))
 
     def _get_items_partial(self, item_pool, missing_item):
         new_items = item_pool[0].copy()
         new_items.remove(missing_item)
         items = self._create_items(new_items, 1)
-        return self.get_state(items)
+        return self.assert_compiled_rules_agree(self.get_state(items))
             
@@ -1,4 +1,7 @@
-from typing import List
+from bisect import bisect
+from functools import lru_cache
+from itertools import accumulate
+from typing import List, Tuple
 
 from BaseClasses import Item
 from worlds.AutoWorld import World
@@ -6,21 +9,36 @@ from worlds.AutoWorld import World
 from . import Constants
 
 
-def get_junk_item_names(rand, k: int) -> str:
-	junk_weights = Constants.item_info["junk_weights"]
-	junk = rand.choices(
-		list(junk_weights.keys()),
-		weights=list(junk_weights.values()),
-		k=k)
-	return junk
+@lru_cache(maxsize=None)
+def get_junk_table() -> Tuple[Tuple[str, ...], Tuple[int, ...], float]:
+	# Junk item names and their cumulative weights, built once from items.json on first use.
+	# Drawing with these takes one rand.random() per item and maps it exactly like rand.choices with the plain
+	# weights does, so a given seed still produces the same junk items in the same order.
+	junk_cum_weights = tuple(accumulate(Constants.item_info["junk_weights"].values()))
+	return tuple(Constants.item_info["junk_weights"].keys()), junk_cum_weights, junk_cum_weights[-1] + 0.0
+
+
+def get_junk_item_names(rand, k: int) -> List[str]:
+	junk_names, junk_cum_weights, _ = get_junk_table()
+	return rand.choices(junk_names, cum_weights=junk_cum_weights, k=k)
+
+
+def get_junk_item_name(rand) -> str:
+	# same draw as get_junk_item_names(rand, 1)[0], without building a list
+	junk_names, junk_cum_weights, junk_total_weight = get_junk_table()
+	return junk_names[bisect(junk_cum_weights, rand.random() * junk_total_weight, 0, len(junk_names) - 1)]
+
+
+def get_unfilled_location_count(mc_world: World) -> int:
+	# Count the unfilled locations in the regions this world created rather than every location in the multiworld
+	return sum(1 for region in mc_world.layer_regions for location in region.locations if location.item is None)
 
 
 def build_item_pool(mc_world: World) -> List[Item]:
 	mcworld = mc_world.multiworld
-	player = mc_world.player
 
 	itempool = []
-	total_location_count = len(mcworld.get_unfilled_locations(player))
+	total_location_count = get_unfilled_location_count(mc_world)
 
 	required_pool = Constants.item_info["required_pool"]
 
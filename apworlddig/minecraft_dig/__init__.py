@@ -8,14 +8,28 @@ from typing import Dict, Any
 
 from BaseClasses import Region, Entrance, Item, ItemClassification, Location
 from worlds.AutoWorld import World
+from worlds.LauncherComponents import Component, SuffixIdentifier, Type, components
 
 from . import Constants
-from .ItemPool import build_item_pool, get_junk_item_names
+from .ItemPool import build_item_pool, get_junk_item_name
 from .Rules import set_rules
 from .MinecraftDigPatch import MinecraftDigProcedurePatch
-from .MinecraftDigClient import add_to_launcher_components
 
-add_to_launcher_components()
+
+def launch_client(*args):
+    # The client imports tkinter, requests and the rest of its dependencies, so only load it when it's launched
+    from .MinecraftDigClient import run_client_threaded
+    run_client_threaded(*args)
+
+
+components.append(Component(
+    "Minecraft Dig Client",
+    func=launch_client,
+    component_type=Type.CLIENT,
+    file_identifier=SuffixIdentifier(".apmcdig"),
+    cli=True
+))
+
 client_version = -1
 GAME_NAME = "Minecraft Dig"
 
@@ -77,11 +91,15 @@ class MinecraftDigWorld(World):
     settings: typing.ClassVar[MinecraftDigSettings] = MinecraftDigSettings()
     topology_present = False
 
-    item_name_to_id = Constants.item_name_to_id
-    location_name_to_id = Constants.location_name_to_id
+    # Plain copies of the read-only maps in Constants, since Archipelago serialises them into the datapackage
+    item_name_to_id = dict(Constants.item_name_to_id)
+    location_name_to_id = dict(Constants.location_name_to_id)
 
     data_version = 0
 
+    # regions created by create_regions, for counting their locations without scanning the multiworld
+    layer_regions: typing.List[Region]
+
     def _get_mc_data(self) -> Dict[str, Any]:
         return {
             'world_seed': self.random.getrandbits(32),
@@ -93,15 +111,8 @@ class MinecraftDigWorld(World):
         }
 
     def create_item(self, name: str) -> Item:
-        item_class = ItemClassification.filler
-        if name in Constants.item_info["progression_items"]:
-            item_class = ItemClassification.progression
-        elif name in Constants.item_info["useful_items"]:
-            item_class = ItemClassification.useful
-        elif name in Constants.item_info["trap_items"]:
-            item_class = ItemClassification.trap
-
-        return MinecraftDigItem(name, item_class, self.item_name_to_id.get(name, None), self.player)
+        item_class, item_id = Constants.item_table.get(name, (ItemClassification.filler, None))
+        return MinecraftDigItem(name, item_class, item_id, self.player)
 
     def create_event(self, region_name: str, event_name: str) -> None:
         region = self.multiworld.get_region(region_name, self.player)
@@ -115,6 +126,8 @@ class MinecraftDigWorld(World):
         return item
 
     def create_regions(self) -> None:
+        self.layer_regions = []
+
         # Create regions and generate location names
         for region_name, exits, layer_range in Constants.region_info["regions"]:
             r = Region(region_name, self.player, self.multiworld)
@@ -132,6 +145,7 @@ class MinecraftDigWorld(World):
                     r.locations.append(loc)
 
             self.multiworld.regions.append(r)
+            self.layer_regions.append(r)
 
         # Bind mandatory connections
         for entr_name, region_name in Constants.region_info["mandatory_connections"]:
@@ -163,15 +177,18 @@ class MinecraftDigWorld(World):
         return slot_data
 
     def get_filler_item_name(self) -> str:
-        return get_junk_item_names(self.multiworld.random, 1)[0]
+        return get_junk_item_name(self.multiworld.random)
 
 
 class MinecraftDigLocation(Location):
     game = GAME_NAME
 
 
+# Item is slotted in Archipelago, so with empty slots items carry no instance __dict__.
+# Location has no slots, so its instances keep one either way.
 class MinecraftDigItem(Item):
     game = GAME_NAME
+    __slots__ = ()
 
 
 def mc_update_output(raw_data, server, port):
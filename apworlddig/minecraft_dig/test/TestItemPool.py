@@ -0,0 +1,20 @@
+from . import DigTestBase
+from ..ItemPool import get_unfilled_location_count
+
+
+class TestItemPool(DigTestBase):
+
+    def assert_count_matches_scan(self):
+        world = self.multiworld.worlds[self.player]
+        self.assertEqual(get_unfilled_location_count(world), len(self.multiworld.get_unfilled_locations(self.player)))
+
+    def test_unfilled_location_count(self):
+        self.assert_count_matches_scan()
+
+    def test_filled_layer_not_counted(self):
+        world = self.multiworld.worlds[self.player]
+        location = next(location for region in world.layer_regions for location in region.locations)
+        before = get_unfilled_location_count(world)
+        location.place_locked_item(world.create_item(self.multiworld.itempool[0].name))
+        self.assertEqual(get_unfilled_location_count(world), before - 1)
+        self.assert_count_matches_scan()
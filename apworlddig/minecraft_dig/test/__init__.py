@@ -0,0 +1,7 @@
+from test.bases import WorldTestBase
+from .. import GAME_NAME
+
+
+class DigTestBase(WorldTestBase):
+    game = GAME_NAME
+    player: int = 1